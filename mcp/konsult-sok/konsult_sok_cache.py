@@ -0,0 +1,127 @@
+"""
+Two-tier cache for platform search results.
+An in-memory LRU sits in front of a SQLite file, so repeat searches are answered without
+touching the network and the cache survives restarts. Entries store parsed jobs with the
+time they were fetched and the page's HTTP validators (ETag, Last-Modified, max-age);
+callers decide from the age whether an entry is fresh, stale (usable while it is
+refreshed) or expired, and revalidate with a conditional GET.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+# Entries kept in memory; the rest are read from disk on demand
+MEMORY_ENTRIES = 256
+# Writes between sweeps of expired rows from the file
+PRUNE_EVERY = 100
+
+
+def cache_key(platform_id: str, query: str, location: str | None) -> str:
+    """Key for one platform search. Case and extra whitespace do not give new entries."""
+    def normalize(text: str | None) -> str:
+        return " ".join((text or "").split()).casefold()
+
+    return f"{platform_id}\t{normalize(query)}\t{normalize(location)}"
+
+
+class SearchCache:
+    """In-memory LRU in front of a persistent SQLite store of (jobs, fetch time) entries."""
+
+    def __init__(self, path: Path, max_age: float, memory_entries: int = MEMORY_ENTRIES):
+        """
+        Args:
+            path: SQLite file, created on first use
+            max_age: Seconds after which entries are of no use and are dropped
+            memory_entries: Entries kept in the in-memory LRU
+        """
+        self.path = path
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+        self.memory: OrderedDict[str, tuple[list[dict], float, dict]] = OrderedDict()
+        self.lock = threading.Lock()
+        self.db = None
+        self.writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, fetched REAL NOT NULL, jobs TEXT NOT NULL, validators TEXT)"
+            )
+            columns = {row[1] for row in self.db.execute("PRAGMA table_info(results)")}
+            if "validators" not in columns:  # Files from before validators were stored
+                self.db.execute("ALTER TABLE results ADD COLUMN validators TEXT")
+            self._prune()
+        return self.db
+
+    def _prune(self):
+        with self.db:
+            self.db.execute("DELETE FROM results WHERE fetched < ?", (time.time() - self.max_age,))
+
+    def _remember(self, key: str, entry: tuple[list[dict], float, dict]):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> tuple[list[dict], float, dict] | None:
+        """
+        Look up an entry.
+
+        Returns:
+            Tuple of (jobs, age in seconds, HTTP validators), or None if missing or
+            older than max_age
+        """
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.memory.move_to_end(key)
+            else:
+                try:
+                    row = self._connect().execute(
+                        "SELECT jobs, fetched, validators FROM results WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is None:
+                    return None
+                entry = (json.loads(row[0]), row[1], json.loads(row[2] or "{}"))
+                self._remember(key, entry)
+
+        jobs, fetched, validators = entry
+        age = time.time() - fetched
+        if age > self.max_age:
+            return None
+        return jobs, age, validators
+
+    def put(self, key: str, jobs: list[dict], validators: dict | None = None):
+        """Store freshly fetched (or revalidated) jobs with the response's validators."""
+        entry = (jobs, time.time(), validators or {})
+        with self.lock:
+            self._remember(key, entry)
+            try:
+                db = self._connect()
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO results (key, fetched, jobs, validators) VALUES (?, ?, ?, ?)",
+                        (key, entry[1], json.dumps(jobs, ensure_ascii=False), json.dumps(entry[2])),
+                    )
+                self.writes += 1
+                if self.writes % PRUNE_EVERY == 0:
+                    self._prune()
+            except sqlite3.Error:
+                pass  # The in-memory tier still has the entry
+
+    def clear(self):
+        """Drop all entries."""
+        with self.lock:
+            self.memory.clear()
+            with self._connect() as db:
+                db.execute("DELETE FROM results")
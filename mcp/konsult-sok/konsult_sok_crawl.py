@@ -0,0 +1,239 @@
+"""
+Background crawl scheduler for konsult-sok.
+Keeps saved searches, and searches people have made recently, warm in the cache and job
+index by re-fetching them per platform on a schedule. Searches made often ("hot") are
+refreshed before their cached results expire; others less often. Each broker host has a
+request budget, so the load on the brokers stays bounded and spread out.
+"""
+
+import asyncio
+import heapq
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+# Interval between crawls of a search on a platform, as multiples of the platform's
+# cache TTL: cold searches at the slowest, hot ones just before their results expire
+COLD_INTERVAL = 4.0
+HOT_INTERVAL = 0.8
+# Intervals vary randomly by this fraction, so crawls do not line up
+JITTER = 0.15
+# Interactive searches add 1 to a search's heat, which halves every HEAT_HALF_LIFE seconds.
+# Searches that are not saved stop being crawled when their heat falls below MIN_HEAT.
+HEAT_HALF_LIFE = 24 * 3600
+MIN_HEAT = 0.25
+# New searches are spread over this many seconds before their first crawl
+INITIAL_SPREAD = 60
+
+
+def search_key(query: str, location: str | None) -> tuple[str, str]:
+    """Searches differing only in case and whitespace are the same search."""
+    return " ".join(query.split()).casefold(), " ".join((location or "").split()).casefold()
+
+
+class HostBudget:
+    """Token bucket per host: at most `per_hour` requests an hour, in bursts of at most `burst`."""
+
+    def __init__(self, per_hour: float, burst: int = 2):
+        self.rate = per_hour / 3600
+        self.burst = burst
+        self.buckets: dict[str, tuple[float, float]] = {}  # host -> (tokens, updated)
+
+    def take(self, host: str, now: float | None = None) -> float:
+        """
+        Take a request token for host.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.time() if now is None else now
+        tokens, updated = self.buckets.get(host, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self.buckets[host] = (tokens - 1, now)
+            return 0.0
+        self.buckets[host] = (tokens, now)
+        return (1 - tokens) / self.rate
+
+
+class CrawlScheduler:
+    """Priority queue of (due time, platform, search) crawls, run by one background task."""
+
+    def __init__(
+        self,
+        crawl: Callable[[str, str, str | None], Awaitable[None]],
+        hosts: dict[str, str],
+        ttls: dict[str, float],
+        budget: HostBudget,
+        saved_path: Path,
+        concurrency: int = 2
+    ):
+        """
+        Args:
+            crawl: Coroutine function fetching one search on one platform
+            hosts: Platform id -> host, for the politeness budget
+            ttls: Platform id -> cache TTL in seconds
+            budget: Per-host request budget
+            saved_path: JSON file with the saved searches
+            concurrency: Crawls running at the same time
+        """
+        self.crawl = crawl
+        self.hosts = hosts
+        self.ttls = ttls
+        self.budget = budget
+        self.saved_path = saved_path
+        self.concurrency = concurrency
+        self.saved: dict[tuple[str, str], tuple[str, str | None]] = {}
+        self.heat: dict[tuple[str, str], tuple[float, float]] = {}  # key -> (heat, updated)
+        self.names: dict[tuple[str, str], tuple[str, str | None]] = {}  # key -> (query, location)
+        self.queue: list[tuple[float, int, str, tuple[str, str]]] = []
+        self.scheduled: set[tuple[str, tuple[str, str]]] = set()
+        self.counter = 0
+        self.crawls = 0
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.running: set[asyncio.Task] = set()
+
+    def load_saved(self):
+        """Read the saved searches and schedule them."""
+        try:
+            with open(self.saved_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"query": entry}
+            if isinstance(entry, dict) and entry.get("query"):
+                self.save(entry["query"], entry.get("location"), persist=False)
+
+    def _persist(self):
+        entries = [{"query": q, "location": loc} if loc else {"query": q} for q, loc in self.saved.values()]
+        temporary = self.saved_path.with_name(self.saved_path.name + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        temporary.replace(self.saved_path)
+
+    def save(self, query: str, location: str | None = None, persist: bool = True):
+        """Add a saved search, crawled until it is removed."""
+        key = search_key(query, location)
+        self.saved[key] = self.names[key] = (query, location or None)
+        if persist:
+            self._persist()
+        self._schedule_all(key, first=True)
+
+    def remove(self, query: str, location: str | None = None) -> bool:
+        """Remove a saved search. It is still crawled while it is hot."""
+        if self.saved.pop(search_key(query, location), None) is None:
+            return False
+        self._persist()
+        return True
+
+    def touch(self, query: str, location: str | None = None):
+        """Record an interactive search, making it hotter and scheduling it if it was not."""
+        key = search_key(query, location)
+        self.heat[key] = (self.current_heat(key) + 1, time.time())
+        self.names.setdefault(key, (query, location or None))
+        # It was just fetched, so the first crawl can wait a full interval
+        self._schedule_all(key, first=False)
+
+    def current_heat(self, key: tuple[str, str], now: float | None = None) -> float:
+        heat, updated = self.heat.get(key, (0.0, 0.0))
+        now = time.time() if now is None else now
+        return heat * 0.5 ** ((now - updated) / HEAT_HALF_LIFE)
+
+    def active(self, key: tuple[str, str]) -> bool:
+        """Whether a search should still be crawled."""
+        return key in self.saved or self.current_heat(key) >= MIN_HEAT
+
+    def interval(self, platform_id: str, key: tuple[str, str]) -> float:
+        """Seconds until the next crawl of a search on a platform, with jitter."""
+        heat = self.current_heat(key)
+        factor = max(HOT_INTERVAL, COLD_INTERVAL / (1 + heat))
+        return self.ttls[platform_id] * factor * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def _push(self, due: float, platform_id: str, key: tuple[str, str]):
+        self.counter += 1
+        heapq.heappush(self.queue, (due, self.counter, platform_id, key))
+        self.scheduled.add((platform_id, key))
+        self.wakeup.set()
+
+    def _schedule_all(self, key: tuple[str, str], first: bool):
+        now = time.time()
+        for platform_id in self.hosts:
+            if (platform_id, key) in self.scheduled:
+                continue
+            due = now + random.uniform(0, INITIAL_SPREAD) if first else now + self.interval(platform_id, key)
+            self._push(due, platform_id, key)
+
+    def start(self):
+        """Start the scheduler task on the running event loop."""
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the scheduler and any crawls in progress."""
+        if self.task is not None:
+            self.task.cancel()
+            for task in list(self.running):
+                task.cancel()
+            await asyncio.gather(self.task, *self.running, return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            self.wakeup.clear()
+            if not self.queue:
+                await self.wakeup.wait()
+                continue
+            due, _, platform_id, key = self.queue[0]
+            now = time.time()
+            if due > now:
+                # Sleep until the next crawl is due, or a new one is scheduled
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), due - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self.queue)
+            if not self.active(key):
+                self.scheduled.discard((platform_id, key))
+                continue
+            wait = self.budget.take(self.hosts[platform_id], now)
+            if wait > 0:
+                self._push(now + wait * random.uniform(1, 1 + JITTER), platform_id, key)
+                continue
+
+            await slots.acquire()
+            task = asyncio.create_task(self._crawl(platform_id, key))
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _crawl(self, platform_id: str, key: tuple[str, str]):
+        query, location = self.names[key]
+        try:
+            await self.crawl(platform_id, query, location)
+            self.crawls += 1
+        except Exception as e:
+            print(f"Crawl of '{query}' on {platform_id} failed: {e}", file=sys.stderr)
+        finally:
+            self._push(time.time() + self.interval(platform_id, key), platform_id, key)
+
+    def status(self) -> list[dict]:
+        """Searches being crawled, with heat and the time until each one's next crawl."""
+        next_due: dict[tuple[str, str], float] = {}
+        for due, _, _, key in self.queue:
+            next_due[key] = min(due, next_due.get(key, due))
+        now = time.time()
+        return [
+            {"query": query, "location": location, "saved": key in self.saved,
+             "heat": round(self.current_heat(key), 2),
+             "next_crawl_s": round(max(0.0, next_due[key] - now)) if key in next_due else None}
+            for key, (query, location) in self.names.items() if self.active(key)
+        ]
@@ -0,0 +1,112 @@
+"""
+Near-duplicate detection for jobs posted on several platforms.
+Brokers often list the same assignment with slightly different wording. Each job gets a
+MinHash signature over the word pairs of its normalized title and description, and
+signatures are bucketed with LSH (banding), so only jobs sharing a band are compared
+instead of every pair.
+"""
+
+import hashlib
+import random
+import re
+from functools import lru_cache
+
+# Hash functions in a signature, split into BANDS bands of NUM_PERM // BANDS rows.
+# With 16 bands of 4 rows, jobs with Jaccard similarity 0.7 share a band 99% of the
+# time and jobs at 0.3 about 12% of the time.
+NUM_PERM = 64
+BANDS = 16
+# Estimated Jaccard similarity from which two jobs are the same assignment
+THRESHOLD = 0.6
+
+# Each hash function is the 64-bit shingle hash XORed with a random mask: several times
+# cheaper than (a*x + b) mod p in Python, and as accurate with a well-mixed shingle hash.
+# Fixed seed: signatures must not change between runs.
+_rng = random.Random(4711)
+MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+
+# Signatures are cached by text, since the same jobs come back from the cache and index
+SIGNATURE_CACHE_SIZE = 4096
+
+WORD = re.compile(r"\w+")
+
+
+def shingles(text: str) -> set[int]:
+    """Hashed word pairs of text, or single words if there is only one."""
+    words = WORD.findall(text.casefold())
+    grams = [f"{a} {b}" for a, b in zip(words, words[1:])] or words
+    return {int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "little") for gram in grams}
+
+
+def minhash(hashes: set[int]) -> tuple[int, ...]:
+    """MinHash signature of a set of shingle hashes."""
+    if not hashes:
+        return ()
+    return tuple(min([h ^ mask for h in hashes]) for mask in MASKS)
+
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def text_signature(text: str) -> tuple[int, ...]:
+    return minhash(shingles(text))
+
+
+def signature(job: dict) -> tuple[int, ...]:
+    """MinHash signature of a job's title and description."""
+    return text_signature(f"{job.get('title') or ''} {job.get('description') or ''}")
+
+
+def similarity(first: tuple[int, ...], second: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def duplicate_groups(jobs: list[tuple[str, dict]], threshold: float = THRESHOLD) -> list[list[int]]:
+    """
+    Find jobs that are the same assignment on different platforms.
+
+    Args:
+        jobs: List of (platform id, job)
+        threshold: Estimated Jaccard similarity from which jobs are merged
+
+    Returns:
+        Groups of indices into jobs, each with at most one job per platform and at
+        least two jobs. A platform lists an assignment once, so jobs on the same
+        platform are never merged, even when they are written from the same template.
+    """
+    rows = NUM_PERM // BANDS
+    signatures = [signature(job) for _, job in jobs]
+    buckets: dict[tuple, list[int]] = {}
+    for i, job_signature in enumerate(signatures):
+        if not job_signature:
+            continue
+        for band in range(BANDS):
+            buckets.setdefault((band, job_signature[band * rows:(band + 1) * rows]), []).append(i)
+
+    candidates = set()
+    for members in buckets.values():
+        for n, i in enumerate(members):
+            for j in members[n + 1:]:
+                if jobs[i][0] != jobs[j][0]:
+                    candidates.add((i, j))
+
+    pairs = []
+    for i, j in candidates:
+        score = similarity(signatures[i], signatures[j])
+        if score >= threshold:
+            pairs.append((score, i, j))
+
+    # Most similar pairs first; groups are joined only if they share no platform
+    group_of = {i: {i} for i in range(len(jobs))}
+    platforms_of = {i: {jobs[i][0]} for i in range(len(jobs))}
+    for _, i, j in sorted(pairs, reverse=True):
+        first, second = group_of[i], group_of[j]
+        if first is second or platforms_of[min(first)] & platforms_of[min(second)]:
+            continue
+        merged = first | second
+        platforms = platforms_of[min(first)] | platforms_of[min(second)]
+        for member in merged:
+            group_of[member] = merged
+        platforms_of[min(merged)] = platforms
+
+    groups = {id(group): sorted(group) for group in group_of.values() if len(group) > 1}
+    return sorted(groups.values())
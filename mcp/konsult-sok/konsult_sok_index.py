@@ -0,0 +1,220 @@
+"""
+Local full-text index of every job seen by konsult-sok.
+Jobs from live searches and background crawls are collected in a SQLite FTS5 table,
+deduplicated by link (or by platform and title when there is no link), so searches can
+be answered locally with BM25 ranking instead of being limited to the ten jobs each
+platform returns per scrape.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+# Jobs not seen in any search or crawl for this long are treated as filled and dropped
+JOB_MAX_AGE = 30 * 24 * 3600
+# BM25 weights for title, description and location
+BM25_WEIGHTS = (10.0, 2.0, 1.0)
+# Price buckets for facets, in SEK/hour: (upper bound, label)
+PRICE_BUCKETS = [(700, "< 700"), (900, "700-899"), (1100, "900-1099"), (1300, "1100-1299"), (None, "1300+")]
+
+WORD = re.compile(r"\w+")
+
+
+def link_key(link: str) -> str:
+    """Link with case-insensitive parts lowercased and fragment and trailing slash removed."""
+    parts = urlsplit(link.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def title_key(title: str) -> str:
+    """Title reduced to lowercase words, so spacing and punctuation do not matter."""
+    return " ".join(WORD.findall(title.casefold()))
+
+
+def fts_query(text: str) -> str | None:
+    """FTS5 query matching all words of text, the last one also as a prefix."""
+    words = WORD.findall(text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def price_bucket(price: int | None) -> str:
+    if price is None:
+        return "okänt"
+    for upper, label in PRICE_BUCKETS:
+        if upper is None or price < upper:
+            return label
+    return PRICE_BUCKETS[-1][1]
+
+
+def job_facets(jobs: list[dict]) -> dict[str, Counter]:
+    """Counts of jobs per platform, location and price bucket."""
+    return {
+        "platform": Counter(job["platform"] for job in jobs),
+        "location": Counter(job.get("location") or "okänd" for job in jobs),
+        "price": Counter(price_bucket(job.get("price")) for job in jobs),
+    }
+
+
+class JobIndex:
+    """SQLite FTS5 index of scraped jobs."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY,
+                    platform_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    link TEXT NOT NULL,
+                    link_key TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    location_key TEXT NOT NULL,
+                    price INTEGER,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS jobs_link ON jobs (link_key) WHERE link_key != '';
+                CREATE INDEX IF NOT EXISTS jobs_title ON jobs (platform_id, title_key);
+                CREATE INDEX IF NOT EXISTS jobs_seen ON jobs (last_seen);
+                CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+                    title, description, location,
+                    content='jobs', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS jobs_insert AFTER INSERT ON jobs BEGIN
+                    INSERT INTO jobs_fts (rowid, title, description, location)
+                    VALUES (new.id, new.title, new.description, new.location);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_delete AFTER DELETE ON jobs BEGIN
+                    INSERT INTO jobs_fts (jobs_fts, rowid, title, description, location)
+                    VALUES ('delete', old.id, old.title, old.description, old.location);
+                END;
+                CREATE TRIGGER IF NOT EXISTS jobs_update AFTER UPDATE OF title, description, location ON jobs BEGIN
+                    INSERT INTO jobs_fts (jobs_fts, rowid, title, description, location)
+                    VALUES ('delete', old.id, old.title, old.description, old.location);
+                    INSERT INTO jobs_fts (rowid, title, description, location)
+                    VALUES (new.id, new.title, new.description, new.location);
+                END;
+            """)
+            with db:
+                db.execute("DELETE FROM jobs WHERE last_seen < ?", (time.time() - JOB_MAX_AGE,))
+            self.db = db
+        return self.db
+
+    def add(self, platform_id: str, jobs: list[dict]) -> int:
+        """
+        Add or refresh jobs scraped from a platform.
+
+        Returns:
+            Number of jobs that were not in the index before
+        """
+        now = time.time()
+        added = 0
+        with self.lock:
+            db = self._connect()
+            with db:
+                for job in jobs:
+                    link = job.get("link") or ""
+                    keys = (link_key(link) if link else "", title_key(job["title"]))
+                    row = None
+                    if keys[0]:
+                        row = db.execute("SELECT id FROM jobs WHERE link_key = ?", (keys[0],)).fetchone()
+                    if row is None:
+                        row = db.execute(
+                            "SELECT id FROM jobs WHERE platform_id = ? AND title_key = ?", (platform_id, keys[1])
+                        ).fetchone()
+                    values = (job["title"], keys[1], link, keys[0], job.get("description") or "",
+                              job.get("location") or "", (job.get("location") or "").casefold(),
+                              job.get("price"), now)
+                    if row is None:
+                        db.execute(
+                            "INSERT INTO jobs (title, title_key, link, link_key, description, location, "
+                            "location_key, price, last_seen, platform_id, platform, first_seen) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            values + (platform_id, job["platform"], now),
+                        )
+                        added += 1
+                    else:
+                        db.execute(
+                            "UPDATE jobs SET title = ?, title_key = ?, link = ?, link_key = ?, description = ?, "
+                            "location = ?, location_key = ?, price = ?, last_seen = ? WHERE id = ?",
+                            values + (row[0],),
+                        )
+        return added
+
+    def search(
+        self,
+        query: str,
+        platforms: list[str] | None = None,
+        location: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        limit: int = 200
+    ) -> list[tuple[str, dict]]:
+        """
+        Jobs matching all words of query, best BM25 match first.
+
+        Location and price filters follow filter_jobs_by_location and
+        filter_jobs_by_price in the server: jobs without a location or price are kept.
+
+        Returns:
+            List of (platform id, job)
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+        sql = [
+            "SELECT jobs.platform_id, jobs.platform, jobs.title, jobs.link, jobs.description, jobs.location, jobs.price",
+            "FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid",
+            "WHERE jobs_fts MATCH ? AND jobs.last_seen >= ?",
+        ]
+        params: list = [match, time.time() - JOB_MAX_AGE]
+        if platforms:
+            sql.append(f"AND jobs.platform_id IN ({', '.join('?' * len(platforms))})")
+            params.extend(platforms)
+        if location:
+            sql.append("AND (jobs.location_key = '' OR instr(jobs.location_key, ?) OR instr(?, jobs.location_key))")
+            params.extend([location.casefold()] * 2)
+        if min_price:
+            sql.append("AND (jobs.price IS NULL OR jobs.price >= ?)")
+            params.append(min_price)
+        if max_price:
+            sql.append("AND (jobs.price IS NULL OR jobs.price <= ?)")
+            params.append(max_price)
+        sql.append(f"ORDER BY bm25(jobs_fts, {', '.join(map(str, BM25_WEIGHTS))}) LIMIT ?")
+        params.append(limit)
+
+        with self.lock:
+            rows = self._connect().execute(" ".join(sql), params).fetchall()
+        return [
+            (platform_id, {"title": title, "link": link, "description": description,
+                           "location": job_location, "price": price, "platform": platform})
+            for platform_id, platform, title, link, description, job_location, price in rows
+        ]
+
+    def stats(self) -> dict:
+        """Number of jobs in the index, in total and per platform."""
+        with self.lock:
+            rows = self._connect().execute(
+                "SELECT platform, COUNT(*) FROM jobs WHERE last_seen >= ? GROUP BY platform",
+                (time.time() - JOB_MAX_AGE,),
+            ).fetchall()
+        return {"total": sum(n for _, n in rows), "platforms": dict(rows)}
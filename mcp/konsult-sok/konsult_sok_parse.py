@@ -0,0 +1,238 @@
+"""
+Parsing of broker search pages into job listings.
+Kept apart from the server so parser worker processes only import BeautifulSoup.
+
+Each host gets a parser profile: the selector that last found jobs there. Pages from a
+host with a profile are parsed with a SoupStrainer that builds only the listing
+subtrees, instead of the whole document followed by the generic selector cascade.
+"""
+
+import json
+import re
+from bisect import bisect_right
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+# A number, with space, no-break space or thin space between thousands: 850, 1 050
+NUMBER = r"(?<![\d.,])(?:\d{1,3}(?:[ \u00a0\u202f]\d{3})+|\d+)"
+# All hourly rate formats in one pattern, tried in a single pass:
+#   800-1000 kr, 800–1 000 SEK/h    range (average is used)
+#   850 kr/tim, 850:-/h, 1 050 SEK/h, 850 kr per timme, 850 k/h, 1,1k/h
+#   timpris: 850, timarvode 850
+# Every alternative starts with a digit or "tim"; the lookahead lets the scan skip other
+# positions without trying each alternative, which halves the time on long card texts.
+PRICE_PATTERN = re.compile(
+    rf"(?=[\dt])(?:(?P<low>{NUMBER})\s*[-–—]\s*(?P<high>{NUMBER})\s*(?:kr|sek|:-)"
+    rf"|(?P<rate>{NUMBER}(?:[.,]\d+)?)\s*(?P<unit>kr|sek|:-|k)\s*(?:/|per\b)?\s*(?:tim|hour|h(?![a-zåäö]))"
+    rf"|tim(?:pris|arvode)[:\s]*(?P<label>{NUMBER}))",
+    re.IGNORECASE
+)
+# Separates texts in batch extraction; cannot be part of a match
+BATCH_SEPARATOR = "\x00"
+
+
+def _number(text: str) -> float:
+    return float("".join(text.split()).replace(",", "."))
+
+
+def _price(match: re.Match) -> int | None:
+    """SEK/hour from a PRICE_PATTERN match, or None if it is not a plausible hourly rate."""
+    if match.group("low"):
+        price = (_number(match.group("low")) + _number(match.group("high"))) / 2
+    elif match.group("rate"):
+        price = _number(match.group("rate"))
+        if match.group("unit").lower() == "k" and price < 10:
+            price *= 1000  # 1,1k/h
+    else:
+        price = _number(match.group("label"))
+    # Sanity check for hourly rates (typically 500-2000 SEK)
+    return int(price) if 300 <= price <= 3000 else None
+
+
+def extract_prices(texts: list[str | None]) -> list[int | None]:
+    """
+    Extract hourly rates from many texts in one regex pass. The scan jumps to the next
+    text as soon as one has a price.
+
+    Returns:
+        SEK/hour or None for each text
+    """
+    prices: list[int | None] = [None] * len(texts)
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text or "") + len(BATCH_SEPARATOR)
+    joined = BATCH_SEPARATOR.join(text or "" for text in texts)
+
+    index = position = 0
+    while (match := PRICE_PATTERN.search(joined, position)) is not None:
+        index = bisect_right(starts, match.start(), lo=index) - 1
+        price = _price(match)
+        if price is None:
+            position = match.end()
+            continue
+        prices[index] = price
+        if index + 1 == len(texts):
+            break
+        position = starts[index + 1]
+    return prices
+
+
+def extract_price(text: str) -> int | None:
+    """Extract hourly rate from text. Returns SEK/hour or None."""
+    if not text:
+        return None
+    for match in PRICE_PATTERN.finditer(text):
+        price = _price(match)
+        if price is not None:
+            return price
+    return None
+
+
+# Generic selectors for job listings, tried in order until one gives jobs
+SELECTORS = [
+    'article', '.job-listing', '.job-item', '.uppdrag', '.assignment',
+    '.vacancy', '[class*="job"]', '[class*="uppdrag"]', '.card',
+    'li[class*="job"]', 'div[class*="listing"]'
+]
+# Simple selectors that can be turned into a SoupStrainer: tag, .class, [attr*="x"],
+# optionally combined as tag.class or tag[attr*="x"]
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-z][a-z0-9]*)?'
+    r'(?:\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)\*="(?P<part>[^"]+)"\])?$'
+)
+
+
+def strainer_for(selector: str) -> SoupStrainer | None:
+    """
+    SoupStrainer that keeps only elements matching selector (and their subtrees), or
+    None if the selector is too complex to translate.
+    """
+    match = SIMPLE_SELECTOR.match(selector)
+    if not match or not any(match.groups()):
+        return None
+    tag, cls, attr, part = match.group("tag", "cls", "attr", "part")
+    attrs = {}
+    if cls:
+        # Matched as a function: the strainer sees the whole class attribute, "card shadow"
+        attrs["class"] = lambda value: value is not None and cls in value.split()
+    elif attr:
+        attrs[attr] = lambda value: value is not None and part in value
+    return SoupStrainer(tag, attrs=attrs) if tag else SoupStrainer(attrs=attrs)
+
+
+def extract_jobs(items, base_url: str, platform_name: str) -> list[dict]:
+    """Build job entries from listing elements, skipping those without a usable title."""
+    jobs = []
+    cards = []
+    for item in items:
+        # Try to find title
+        title_elem = item.select_one('h2, h3, h4, .title, [class*="title"], a')
+        if not title_elem:
+            continue
+
+        title = title_elem.get_text(strip=True)
+        if len(title) < 5 or len(title) > 200:
+            continue
+
+        # Try to find link
+        link_elem = item.select_one('a[href]') or title_elem if title_elem.name == 'a' else None
+        link = ""
+        if link_elem and link_elem.get('href'):
+            link = urljoin(base_url, link_elem['href'])
+
+        # Try to find description
+        desc_elem = item.select_one('p, .description, [class*="desc"], .excerpt')
+        description = desc_elem.get_text(strip=True)[:200] if desc_elem else ""
+
+        # Try to find location
+        loc_elem = item.select_one('[class*="location"], [class*="plats"], .city')
+        location = loc_elem.get_text(strip=True) if loc_elem else ""
+
+        # Try to find price/rate
+        price_elem = item.select_one('[class*="price"], [class*="rate"], [class*="pris"], [class*="arvode"]')
+
+        jobs.append({
+            "title": title,
+            "link": link,
+            "description": description,
+            "location": location,
+            "price": None,  # SEK/hour or None, set below
+            "platform": platform_name
+        })
+        cards.append((item, price_elem))
+
+    # Prices of all cards at once: from the price element, then the whole card where
+    # that gave nothing
+    prices = extract_prices([elem.get_text() if elem else None for _, elem in cards])
+    missing = [i for i, price in enumerate(prices) if price is None]
+    for i, price in zip(missing, extract_prices([cards[i][0].get_text() for i in missing])):
+        prices[i] = price
+    for job, price in zip(jobs, prices):
+        job["price"] = price
+    return jobs
+
+
+def parse_jobs_page(html: str, base_url: str, platform_name: str,
+                    selector: str | None = None) -> tuple[list[dict], str | None]:
+    """
+    Parse job listings from a search page.
+
+    Args:
+        html: The page
+        base_url: Base for relative links
+        platform_name: Platform name stored in each job
+        selector: Selector that worked for this host before. It is tried first, building
+            only the matching subtrees; the generic cascade is the fallback.
+
+    Returns:
+        Tuple of (jobs, the selector that found them or None)
+    """
+    if not html:
+        return [], None
+
+    if selector:
+        strainer = strainer_for(selector)
+        soup = BeautifulSoup(html, 'html.parser', parse_only=strainer) if strainer else BeautifulSoup(html, 'html.parser')
+        jobs = extract_jobs(soup.select(selector, limit=10), base_url, platform_name)
+        if jobs:
+            return jobs, selector
+        if strainer is None:
+            return _cascade(soup, base_url, platform_name)
+
+    return _cascade(BeautifulSoup(html, 'html.parser'), base_url, platform_name)
+
+
+def _cascade(soup: BeautifulSoup, base_url: str, platform_name: str) -> tuple[list[dict], str | None]:
+    for selector in SELECTORS:
+        jobs = extract_jobs(soup.select(selector, limit=10), base_url, platform_name)  # Limit to 10 per selector
+        if jobs:
+            return jobs[:10], selector  # Found jobs with this selector
+    return [], None
+
+
+def parse_generic_jobs(html: str, base_url: str, platform_name: str) -> list[dict]:
+    """Generic parser for job listings."""
+    return parse_jobs_page(html, base_url, platform_name)[0]
+
+
+def load_profiles(path: Path) -> dict[str, str]:
+    """Read learned parser profiles: host -> selector that found jobs there."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profiles = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return profiles if isinstance(profiles, dict) else {}
+
+
+def save_profiles(path: Path, profiles: dict[str, str]):
+    """Write parser profiles, via a temporary file so a crash cannot truncate them."""
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(profiles, f, ensure_ascii=False, indent=2, sort_keys=True)
+    temporary.replace(path)
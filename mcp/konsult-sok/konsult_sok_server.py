@@ -7,13 +7,14 @@ Searches the top consulting brokers/platforms in the Stockholm area.
 import os
 import sys
 import asyncio
-import json
+import sqlite3
 import aiohttp
 from pathlib import Path
 from datetime import datetime
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, quote_plus
-import re
+from typing import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import quote_plus, urlparse
 
 # Add parent directory to path to import mcp_common
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -21,6 +22,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from mcp.server import Server
 import mcp.types as types
 from mcp_common import create_text_response, create_error_response, run_mcp_server, safe_get_arg, MCPToolBuilder
+from konsult_sok_cache import SearchCache, cache_key
+from konsult_sok_crawl import CrawlScheduler, HostBudget
+from konsult_sok_dedup import duplicate_groups
+from konsult_sok_index import JobIndex, job_facets, link_key, title_key
+from konsult_sok_parse import load_profiles, parse_jobs_page, save_profiles
 
 # Swedish locations/cities
 LOCATIONS = [
@@ -29,243 +35,411 @@ LOCATIONS = [
     "Borås", "Sundsvall", "Gävle", "Remote", "Distans"
 ]
 
-# Consulting platforms in Stockholm
+HOUR = 3600
+
+# Consulting platforms in Stockholm. cache_ttl is how long (seconds) search results are
+# served from the cache; large brokers with many new listings get shorter times.
 PLATFORMS = {
     "upgraded": {
         "name": "Upgraded",
         "base_url": "https://upgraded.se",
         "search_url": "https://upgraded.se/konsultuppdrag/?search={query}",
         "location_param": "&location={location}",
-        "description": "IT och Management konsultuppdrag"
+        "description": "IT och Management konsultuppdrag",
+        "cache_ttl": 2 * HOUR
     },
     "techrelations": {
         "name": "Tech Relations",
         "base_url": "https://www.techrelations.se",
         "search_url": "https://www.techrelations.se/konsultuppdrag?search={query}",
         "location_param": "&city={location}",
-        "description": "Tech-fokuserade konsultuppdrag"
+        "description": "Tech-fokuserade konsultuppdrag",
+        "cache_ttl": 2 * HOUR
     },
     "wiseit": {
         "name": "Wise IT",
         "base_url": "https://www.wiseit.se",
         "search_url": "https://www.wiseit.se/lediga-uppdrag/?s={query}",
         "location_param": "&location={location}",
-        "description": "IT-konsultuppdrag"
+        "description": "IT-konsultuppdrag",
+        "cache_ttl": 2 * HOUR
     },
     "ework": {
         "name": "Ework",
         "base_url": "https://www.eworkgroup.com",
         "search_url": "https://www.eworkgroup.com/se/konsult/lediga-uppdrag?q={query}",
         "location_param": "&location={location}",
-        "description": "Skandinaviens största konsultmäklare"
+        "description": "Skandinaviens största konsultmäklare",
+        "cache_ttl": HOUR // 2
     },
     "brainville": {
         "name": "Brainville",
         "base_url": "https://brainville.com",
         "search_url": "https://brainville.com/uppdrag/?search={query}",
         "location_param": "&city={location}",
-        "description": "IT-konsultuppdrag i Stockholm"
+        "description": "IT-konsultuppdrag i Stockholm",
+        "cache_ttl": 2 * HOUR
     },
     "experis": {
         "name": "Experis",
         "base_url": "https://www.experis.se",
         "search_url": "https://www.experis.se/sv/karriar/lediga-jobb?q={query}",
         "location_param": "&location={location}",
-        "description": "IT och tech-rekrytering"
+        "description": "IT och tech-rekrytering",
+        "cache_ttl": HOUR // 2
     },
     "randstad": {
         "name": "Randstad",
         "base_url": "https://www.randstad.se",
         "search_url": "https://www.randstad.se/lediga-jobb/?keywords={query}",
         "location_param": "&location={location}",
-        "description": "Konsult och rekrytering"
+        "description": "Konsult och rekrytering",
+        "cache_ttl": HOUR // 2
     },
     "academicwork": {
         "name": "Academic Work",
         "base_url": "https://www.academicwork.se",
         "search_url": "https://www.academicwork.se/lediga-jobb?query={query}",
         "location_param": "&city={location}",
-        "description": "Young professionals och konsulter"
+        "description": "Young professionals och konsulter",
+        "cache_ttl": HOUR // 2
     },
     "manpower": {
         "name": "Manpower",
         "base_url": "https://www.manpower.se",
         "search_url": "https://www.manpower.se/lediga-jobb?q={query}",
         "location_param": "&l={location}",
-        "description": "Bemanning och konsulttjänster"
+        "description": "Bemanning och konsulttjänster",
+        "cache_ttl": HOUR // 2
     },
     "cinode": {
         "name": "Cinode (Konsultkartan)",
         "base_url": "https://cinode.com",
         "search_url": "https://cinode.com/market?search={query}",
         "location_param": "&location={location}",
-        "description": "Konsultplattform och nätverk"
+        "description": "Konsultplattform och nätverk",
+        "cache_ttl": HOUR
     }
 }
 
 # Cache for search results
-CACHE_FILE = Path(__file__).parent / "search_cache.json"
-search_cache = {}
+CACHE_FILE = Path(__file__).parent / "search_cache.sqlite3"
+# After its TTL a result is still served for this long while it is refreshed in the background
+CACHE_STALE_SECONDS = 24 * HOUR
+search_cache = SearchCache(
+    CACHE_FILE, max_age=max(p["cache_ttl"] for p in PLATFORMS.values()) + CACHE_STALE_SECONDS
+)
+# Every job seen in searches and crawls, for local full-text search
+JOB_INDEX_FILE = Path(__file__).parent / "job_index.sqlite3"
+job_index = JobIndex(JOB_INDEX_FILE)
+SOURCES = ["auto", "index", "live"]
+
+# Background refreshes in progress, by cache key
+refresh_tasks: dict[str, asyncio.Task] = {}
+# Searches still running after a search_konsult deadline; kept so they finish and are cached
+background_tasks: set[asyncio.Task] = set()
+# Seconds search_konsult waits before answering with the platforms that are done
+SEARCH_DEADLINE_SECONDS = 8
+
+
+# HTTP connection pool shared by all searches
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
+}
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+CONNECTION_LIMIT = 30          # Open connections in total
+CONNECTION_LIMIT_PER_HOST = 4  # Concurrent requests per broker
+KEEPALIVE_SECONDS = 60         # Idle connections are kept this long for the next search
+DNS_CACHE_SECONDS = 300
+http_session: aiohttp.ClientSession | None = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    The shared HTTP session, created on first use. Keeping it for the server's lifetime
+    lets later searches reuse open TCP/TLS connections and cached DNS lookups.
+    """
+    global http_session
+    if http_session is None or http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+            ttl_dns_cache=DNS_CACHE_SECONDS,
+        )
+        http_session = aiohttp.ClientSession(connector=connector, headers=HTTP_HEADERS, timeout=HTTP_TIMEOUT)
+    return http_session
 
 
-def load_cache():
-    """Load search cache from file."""
-    global search_cache
-    if CACHE_FILE.exists():
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                search_cache = json.load(f)
-        except:
-            search_cache = {}
+async def close_session():
+    """Close the shared HTTP session and its pooled connections."""
+    global http_session
+    if http_session is not None:
+        await http_session.close()
+        http_session = None
 
 
-def save_cache():
-    """Save search cache to file."""
-    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(search_cache, f, ensure_ascii=False, indent=2)
+# Worker processes for parsing search pages, so parsing neither blocks the event loop
+# nor is limited to one core
+PARSE_WORKERS = min(len(PLATFORMS), os.cpu_count() or 1)
+parse_pool: ProcessPoolExecutor | None = None
 
 
-async def fetch_url(session: aiohttp.ClientSession, url: str) -> str:
-    """Fetch URL content with proper headers."""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Accept-Language': 'sv-SE,sv;q=0.9,en;q=0.8',
-    }
-    try:
-        async with session.get(url, headers=headers, timeout=15) as response:
-            if response.status == 200:
-                return await response.text()
-    except Exception as e:
-        pass
-    return ""
+def get_parse_pool() -> ProcessPoolExecutor:
+    """The parser process pool, started on first use."""
+    global parse_pool
+    if parse_pool is None:
+        parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return parse_pool
 
 
-def extract_price(text: str) -> int | None:
-    """Extract hourly rate from text. Returns SEK/hour or None."""
-    if not text:
-        return None
+def close_parse_pool():
+    """Stop the parser processes."""
+    global parse_pool
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
+        parse_pool = None
 
-    # Common patterns for hourly rates in Swedish
-    patterns = [
-        r'(\d[\d\s]*)\s*(?:kr|sek|:-)\s*/?\s*(?:tim|h|hour)',  # 850 kr/tim, 850:-/h
-        r'(\d[\d\s]*)\s*(?:kr|sek|:-)\s*/?\s*(?:timme|timmar)',  # 850 kr/timme
-        r'timpris[:\s]*(\d[\d\s]*)',  # timpris: 850
-        r'timarvode[:\s]*(\d[\d\s]*)',  # timarvode 850
-        r'(\d{3,4})\s*-\s*(\d{3,4})\s*(?:kr|sek)',  # 800-1000 kr (range)
-    ]
 
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            # Handle range (take average)
-            if len(match.groups()) == 2 and match.group(2):
-                low = int(match.group(1).replace(' ', ''))
-                high = int(match.group(2).replace(' ', ''))
-                return (low + high) // 2
-            # Single value
-            price_str = match.group(1).replace(' ', '')
-            price = int(price_str)
-            # Sanity check for hourly rates (typically 500-2000 SEK)
-            if 300 <= price <= 3000:
-                return price
-
-    return None
-
-
-def parse_generic_jobs(html: str, base_url: str, platform_name: str) -> list[dict]:
-    """Generic parser for job listings."""
-    jobs = []
-    if not html:
-        return jobs
+# Learned parser profiles: host -> selector that found jobs there
+PROFILES_FILE = Path(__file__).parent / "parser_profiles.json"
+parser_profiles: dict[str, str] | None = None
 
-    soup = BeautifulSoup(html, 'html.parser')
 
-    # Common patterns for job listings
-    selectors = [
-        'article', '.job-listing', '.job-item', '.uppdrag', '.assignment',
-        '.vacancy', '[class*="job"]', '[class*="uppdrag"]', '.card',
-        'li[class*="job"]', 'div[class*="listing"]'
-    ]
+def get_parser_profiles() -> dict[str, str]:
+    """Parser profiles, read from disk on first use."""
+    global parser_profiles
+    if parser_profiles is None:
+        parser_profiles = load_profiles(PROFILES_FILE)
+    return parser_profiles
+
+
+async def parse_jobs(html: str, base_url: str, platform_name: str) -> list[dict]:
+    """
+    Parse a search page in the process pool. Each platform's page is parsed as soon as
+    it has been fetched, while slower platforms are still downloading.
+
+    The host's parser profile is tried first; when another selector finds the jobs,
+    the profile is updated.
+    """
+    global parse_pool
+    host = urlparse(base_url).netloc
+    profiles = get_parser_profiles()
+    selector = profiles.get(host)
+    loop = asyncio.get_running_loop()
+    try:
+        jobs, used = await loop.run_in_executor(
+            get_parse_pool(), parse_jobs_page, html, base_url, platform_name, selector
+        )
+    except BrokenProcessPool:
+        # A worker died; start a new pool next time and parse this page here
+        parse_pool = None
+        jobs, used = parse_jobs_page(html, base_url, platform_name, selector)
+
+    if used and used != selector:
+        profiles[host] = used
+        try:
+            save_profiles(PROFILES_FILE, profiles)
+        except OSError as e:
+            print(f"Could not save parser profiles: {e}", file=sys.stderr)
+    return jobs
+
+
+def parse_cache_control(header: str | None) -> tuple[int | None, bool]:
+    """
+    Read a Cache-Control header.
+
+    Returns:
+        Tuple of (max-age in seconds or None, whether the response may be stored)
+    """
+    max_age = None
+    storable = True
+    for directive in (header or "").lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name == "no-store":
+            storable = False
+        elif name == "no-cache":
+            max_age = 0
+        elif name == "max-age" and max_age is None:
+            try:
+                max_age = max(0, int(value.strip('"')))
+            except ValueError:
+                pass
+    return max_age, storable
+
+
+async def fetch_page(
+    session: aiohttp.ClientSession,
+    url: str,
+    validators: dict | None = None
+) -> tuple[int | None, str, dict | None]:
+    """
+    Fetch a page, conditionally if validators from an earlier response are given.
+    Compressed responses (gzip, deflate, and br with Brotli installed) are decoded by aiohttp.
+
+    Returns:
+        Tuple of (status: 200, 304 or None on failure, page text, validators for the
+        response or None if it must not be stored)
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        async with session.get(url, headers=headers) as response:
+            if response.status not in (200, 304):
+                return None, "", None
+            max_age, storable = parse_cache_control(response.headers.get("Cache-Control"))
+            fresh = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "max_age": max_age,
+            }
+            if response.status == 304:
+                # A 304 may omit validators that are still valid
+                merged = dict(validators or {})
+                merged.update({k: v for k, v in fresh.items() if v is not None})
+                return 304, "", merged if storable else None
+            return 200, await response.text(), fresh if storable else None
+    except Exception as e:
+        print(f"Could not fetch {url}: {e}", file=sys.stderr)
+        return None, "", None
+
 
-    for selector in selectors:
-        items = soup.select(selector)[:10]  # Limit to 10 per selector
-        for item in items:
-            # Try to find title
-            title_elem = item.select_one('h2, h3, h4, .title, [class*="title"], a')
-            if not title_elem:
-                continue
+def freshness_lifetime(platform: dict, validators: dict) -> float:
+    """Seconds a cached result is fresh: the platform's TTL, or less if the site's max-age says so."""
+    max_age = validators.get("max_age")
+    return platform["cache_ttl"] if max_age is None else min(platform["cache_ttl"], max_age)
 
-            title = title_elem.get_text(strip=True)
-            if len(title) < 5 or len(title) > 200:
-                continue
 
-            # Try to find link
-            link_elem = item.select_one('a[href]') or title_elem if title_elem.name == 'a' else None
-            link = ""
-            if link_elem and link_elem.get('href'):
-                link = urljoin(base_url, link_elem['href'])
+def platform_search_url(platform_id: str, query: str, location: str = None) -> str:
+    """Search URL for a platform, with the location parameter if given."""
+    platform = PLATFORMS[platform_id]
+    search_url = platform["search_url"].format(query=quote_plus(query))
+    if location and "location_param" in platform:
+        search_url += platform["location_param"].format(location=quote_plus(location))
+    return search_url
 
-            # Try to find description
-            desc_elem = item.select_one('p, .description, [class*="desc"], .excerpt')
-            description = desc_elem.get_text(strip=True)[:200] if desc_elem else ""
 
-            # Try to find location
-            loc_elem = item.select_one('[class*="location"], [class*="plats"], .city')
-            location = loc_elem.get_text(strip=True) if loc_elem else ""
+async def fetch_platform_jobs(
+    session: aiohttp.ClientSession,
+    platform_id: str,
+    query: str,
+    location: str = None,
+    cached: tuple[list[dict], dict] | None = None
+) -> list[dict] | None:
+    """
+    Fetch and parse one platform's search page. Caches and returns the jobs, None if the
+    fetch failed.
+
+    Args:
+        cached: (jobs, validators) of the cached result, if any. The page is then fetched
+            conditionally, and on 304 Not Modified the cached jobs are kept without parsing.
+    """
+    platform = PLATFORMS[platform_id]
+    key = cache_key(platform_id, query, location)
+    url = platform_search_url(platform_id, query, location)
+    status, html, validators = await fetch_page(session, url, cached[1] if cached else None)
+
+    if status == 304 and cached:
+        jobs = cached[0]
+    elif status == 200 and html:
+        jobs = await parse_jobs(html, platform["base_url"], platform["name"])
+    else:
+        return None
 
-            # Try to find price/rate
-            price_elem = item.select_one('[class*="price"], [class*="rate"], [class*="pris"], [class*="arvode"]')
-            item_text = item.get_text()
-            price = extract_price(price_elem.get_text() if price_elem else item_text)
+    if validators is not None:
+        search_cache.put(key, jobs, validators)
+    try:
+        job_index.add(platform_id, jobs)
+    except sqlite3.Error as e:
+        print(f"Could not index jobs: {e}", file=sys.stderr)
+    return jobs
 
-            jobs.append({
-                "title": title,
-                "link": link,
-                "description": description,
-                "location": location,
-                "price": price,  # SEK/hour or None
-                "platform": platform_name
-            })
 
-        if jobs:
-            break  # Found jobs with this selector
+async def revalidate_platform(platform_id: str, query: str, location: str = None):
+    """Fetch a search on a platform again, conditionally if it is cached."""
+    entry = search_cache.get(cache_key(platform_id, query, location))
+    cached = (entry[0], entry[2]) if entry else None
+    await fetch_platform_jobs(get_session(), platform_id, query, location, cached)
 
-    return jobs[:10]  # Limit results
+
+async def refresh_platform(platform_id: str, query: str, location: str = None):
+    """Revalidate a stale cache entry in the background."""
+    try:
+        await revalidate_platform(platform_id, query, location)
+    finally:
+        refresh_tasks.pop(cache_key(platform_id, query, location), None)
+
+
+# Background crawls of saved and recently made searches
+CRAWL_ENABLED = os.getenv("KONSULT_SOK_CRAWL", "1") != "0"
+CRAWL_REQUESTS_PER_HOUR = 30  # Per broker host
+CRAWL_CONCURRENCY = 2
+SAVED_SEARCHES_FILE = Path(__file__).parent / "saved_searches.json"
+crawler = CrawlScheduler(
+    revalidate_platform,
+    hosts={pid: urlparse(p["base_url"]).netloc for pid, p in PLATFORMS.items()},
+    ttls={pid: p["cache_ttl"] for pid, p in PLATFORMS.items()},
+    budget=HostBudget(CRAWL_REQUESTS_PER_HOUR),
+    saved_path=SAVED_SEARCHES_FILE,
+    concurrency=CRAWL_CONCURRENCY
+)
 
 
 async def search_platform(
     session: aiohttp.ClientSession,
     platform_id: str,
     query: str,
-    location: str = None
-) -> list[dict]:
-    """Search a specific platform for jobs."""
+    location: str = None,
+    refresh: bool = False
+) -> tuple[list[dict], bool]:
+    """
+    Search a specific platform for jobs, using the cache when possible.
+
+    Fresh cache entries are returned directly. Stale entries are returned too, while a
+    background task revalidates them for the next search. An entry is fresh for the
+    platform's cache_ttl, or the page's Cache-Control max-age if that is shorter.
+
+    Returns:
+        Tuple of (jobs, whether they came from the cache)
+    """
     if platform_id not in PLATFORMS:
-        return []
+        return [], False
 
     platform = PLATFORMS[platform_id]
-    search_url = platform["search_url"].format(query=quote_plus(query))
-
-    # Add location parameter if specified
-    if location and "location_param" in platform:
-        search_url += platform["location_param"].format(location=quote_plus(location))
-
-    html = await fetch_url(session, search_url)
-    jobs = parse_generic_jobs(html, platform["base_url"], platform["name"])
+    key = cache_key(platform_id, query, location)
+    jobs = None
+    cached = False
+
+    entry = search_cache.get(key)
+    if entry is not None and not refresh:
+        jobs, age, validators = entry
+        cached = True
+        if age > freshness_lifetime(platform, validators) and key not in refresh_tasks:
+            refresh_tasks[key] = asyncio.create_task(refresh_platform(platform_id, query, location))
+    else:
+        # Even a forced refresh can be answered with 304 Not Modified
+        previous = (entry[0], entry[2]) if entry else None
+        jobs = await fetch_platform_jobs(session, platform_id, query, location, previous)
 
     # If parsing fails, return direct link to search
     if not jobs:
         jobs = [{
             "title": f"Sök '{query}' på {platform['name']}",
-            "link": search_url,
+            "link": platform_search_url(platform_id, query, location),
             "description": platform["description"],
             "location": location or "",
             "price": None,
-            "platform": platform["name"]
+            "platform": platform["name"],
+            "fallback": True
         }]
 
-    return jobs
+    return jobs, cached
 
 
 def filter_jobs_by_price(jobs: list[dict], min_price: int = None, max_price: int = None) -> list[dict]:
@@ -311,9 +485,19 @@ async def search_all_platforms(
     platforms: list[str] = None,
     location: str = None,
     min_price: int = None,
-    max_price: int = None
+    max_price: int = None,
+    refresh: bool = False,
+    deadline: float | None = None,
+    on_result: Callable[[str, dict, int, int], Awaitable[None]] | None = None
 ) -> dict:
-    """Search all or specified platforms with optional filters."""
+    """
+    Search all or specified platforms with optional filters. refresh bypasses the cache.
+
+    Platforms are handled as they complete. on_result, if given, is awaited with
+    (platform id, platform result, platforms done, platforms in total) for each one.
+    Platforms still running after `deadline` seconds are listed in results["pending"];
+    they keep running in the background so their results are cached for the next search.
+    """
     if platforms is None:
         platforms = list(PLATFORMS.keys())
 
@@ -323,33 +507,219 @@ async def search_all_platforms(
         "price_range": {"min": min_price, "max": max_price},
         "timestamp": datetime.now().isoformat(),
         "platforms": {},
-        "total_jobs": 0
+        "total_jobs": 0,
+        "cached_platforms": 0,
+        "pending": []
     }
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [search_platform(session, p, query, location) for p in platforms if p in PLATFORMS]
-        platform_results = await asyncio.gather(*tasks)
+    session = get_session()
+    platforms = [p for p in platforms if p in PLATFORMS]
 
-        for platform_id, jobs in zip(platforms, platform_results):
-            if platform_id in PLATFORMS:
-                # Apply filters
-                jobs = filter_jobs_by_location(jobs, location)
-                jobs = filter_jobs_by_price(jobs, min_price, max_price)
+    async def search(platform_id: str):
+        return platform_id, await search_platform(session, platform_id, query, location, refresh)
+
+    tasks = [asyncio.create_task(search(p)) for p in platforms]
+    completed = {}
+    try:
+        for next_done in asyncio.as_completed(tasks, timeout=deadline):
+            platform_id, (jobs, cached) = await next_done
+            # Apply filters
+            jobs = filter_jobs_by_location(jobs, location)
+            jobs = filter_jobs_by_price(jobs, min_price, max_price)
+
+            completed[platform_id] = {
+                "name": PLATFORMS[platform_id]["name"],
+                "jobs": jobs,
+                "count": len(jobs),
+                "cached": cached
+            }
+            results["total_jobs"] += len(jobs)
+            results["cached_platforms"] += cached
+            if on_result is not None:
+                await on_result(platform_id, completed[platform_id], len(completed), len(platforms))
+    except asyncio.TimeoutError:
+        for task in tasks:
+            if not task.done():
+                background_tasks.add(task)
+                task.add_done_callback(background_tasks.discard)
+    finally:
+        # Any other early exit (an error, or this search being cancelled) must not leave
+        # platform searches running with nothing awaiting them
+        for task in tasks:
+            if not task.done() and task not in background_tasks:
+                task.cancel()
+
+    # Report in the requested order rather than the order of completion
+    results["platforms"] = {p: completed[p] for p in platforms if p in completed}
+    results["pending"] = [p for p in platforms if p not in completed]
+    return results
 
-                results["platforms"][platform_id] = {
-                    "name": PLATFORMS[platform_id]["name"],
-                    "jobs": jobs,
-                    "count": len(jobs)
-                }
-                results["total_jobs"] += len(jobs)
 
+def index_results(
+    query: str,
+    platforms: list[str] = None,
+    location: str = None,
+    min_price: int = None,
+    max_price: int = None,
+    live: dict | None = None
+) -> dict:
+    """
+    Answer a search from the local job index, in the same shape as search_all_platforms.
+
+    Args:
+        live: Result of search_all_platforms for the same search, if one was made. Its
+            jobs are kept after the index hits, since a site's own search can match text
+            the index does not have (such as full descriptions).
+    """
+    platforms = [p for p in (platforms or PLATFORMS) if p in PLATFORMS]
+    try:
+        hits = job_index.search(query, platforms, location, min_price, max_price)
+    except sqlite3.Error as e:
+        # A broken or locked index must not fail the search; the live results stand alone
+        print(f"Could not search the job index: {e}", file=sys.stderr)
+        if live:
+            return live
+        hits = []
+
+    results = dict(live) if live else {
+        "query": query,
+        "location": location,
+        "price_range": {"min": min_price, "max": max_price},
+        "timestamp": datetime.now().isoformat(),
+        "cached_platforms": 0,
+        "pending": []
+    }
+    results["platforms"] = {}
+    results["total_jobs"] = 0
+    by_platform = {p: [] for p in platforms}
+    for platform_id, job in hits:
+        by_platform[platform_id].append(job)
+
+    for platform_id in platforms:
+        jobs = by_platform[platform_id]
+        live_data = live["platforms"].get(platform_id) if live else None
+        if live_data:
+            seen = {link_key(j["link"]) if j["link"] else title_key(j["title"]) for j in jobs}
+            for job in live_data["jobs"]:
+                if job.get("fallback"):
+                    if not jobs:
+                        jobs.append(job)
+                    continue
+                key = link_key(job["link"]) if job.get("link") else title_key(job["title"])
+                if key not in seen:
+                    seen.add(key)
+                    jobs.append(job)
+        elif not jobs:
+            continue  # Nothing indexed for this platform
+        results["platforms"][platform_id] = {
+            "name": PLATFORMS[platform_id]["name"],
+            "jobs": jobs,
+            "count": sum(1 for j in jobs if not j.get("fallback")),
+            "cached": live_data["cached"] if live_data else True
+        }
+        results["total_jobs"] += results["platforms"][platform_id]["count"]
+    results["facets"] = job_facets([j for d in results["platforms"].values() for j in d["jobs"] if not j.get("fallback")])
     return results
 
 
+def merge_duplicates(results: dict) -> dict:
+    """
+    Merge copies of the same assignment posted on several platforms.
+
+    Each group of near-duplicates is shown once, under the platform whose copy has the
+    most details (a price, the longest description), with the links of all copies in
+    "sources". Platforms get a "duplicates" count of their jobs shown elsewhere.
+    """
+    entries = [(platform_id, job) for platform_id, data in results["platforms"].items()
+               for job in data["jobs"] if not job.get("fallback")]
+    replacements = {}  # id(job) -> merged job, or None if shown under another platform
+    for group in duplicate_groups(entries):
+        copies = [entries[i][1] for i in group]
+        keep = max(copies, key=lambda job: (job.get("price") is not None, len(job.get("description") or "")))
+        for job in copies:
+            replacements[id(job)] = None
+        # Jobs may be shared with the cache, so the merged job is a copy
+        replacements[id(keep)] = {**keep, "sources": [{"platform": job["platform"], "link": job.get("link") or ""}
+                                                      for job in copies]}
+    if not replacements:
+        return results
+
+    results = dict(results)
+    platforms = results["platforms"]
+    results["platforms"] = {}
+    for platform_id, data in platforms.items():
+        jobs = [replacements.get(id(job), job) for job in data["jobs"]]
+        results["platforms"][platform_id] = {
+            **data,
+            "jobs": [job for job in jobs if job is not None],
+            "count": sum(1 for job in jobs if job is not None and not job.get("fallback")),
+            "duplicates": jobs.count(None)
+        }
+    results["total_jobs"] = sum(data["count"] for data in results["platforms"].values())
+    results["duplicates"] = sum(1 for job in replacements.values() if job is None)
+    if "facets" in results:
+        results["facets"] = job_facets([j for d in results["platforms"].values() for j in d["jobs"] if not j.get("fallback")])
+    return results
+
+
+def format_facets(facets: dict) -> list[str]:
+    """Markdown lines summarizing the facets of a result, five largest values each."""
+    labels = {"platform": "Plattform", "location": "Plats", "price": "Timpris"}
+    output = []
+    for name, counts in facets.items():
+        if counts:
+            values = ", ".join(f"{value} ({n})" for value, n in counts.most_common(5))
+            output.append(f"- **{labels[name]}:** {values}")
+    return output
+
+
+def format_platform_result(data: dict) -> list[str]:
+    """Markdown lines for one platform's result, top 5 jobs."""
+    heading = f"{data['count']} träffar"
+    if data.get("duplicates"):
+        heading += f", {data['duplicates']} visas under andra plattformar"
+    output = [f"\n## {data['name']} ({heading})"]
+    for job in data["jobs"][:5]:  # Show top 5 per platform
+        output.append(f"\n### {job['title']}")
+        if job.get('location'):
+            output.append(f"📍 {job['location']}")
+        if job.get('price'):
+            output.append(f"💰 {job['price']} kr/tim")
+        if job.get('description'):
+            output.append(f"{job['description']}")
+        if job.get('link'):
+            output.append(f"[Länk]({job['link']})")
+        others = [source for source in job.get('sources', []) if source["platform"] != job['platform']]
+        if others:
+            links = [f"[{source['platform']}]({source['link']})" if source["link"] else source["platform"] for source in others]
+            output.append(f"🔁 Även på: {', '.join(links)}")
+    return output
+
+
 # Create MCP Server
 server = Server("konsult-sok")
 
 
+def progress_reporter() -> Callable[[str, dict, int, int], Awaitable[None]] | None:
+    """
+    Callback for search_all_platforms that streams each platform's result to the client
+    as an MCP progress notification, or None if the client did not ask for progress.
+    """
+    try:
+        context = server.request_context
+    except LookupError:
+        return None
+    token = context.meta.progressToken if context.meta else None
+    if token is None:
+        return None
+
+    async def report(platform_id: str, data: dict, done: int, total: int):
+        message = "\n".join(format_platform_result(data)).strip()
+        await context.session.send_progress_notification(token, done, total, message=message)
+
+    return report
+
+
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
     """List available tools."""
@@ -378,6 +748,27 @@ async def handle_list_tools() -> list[types.Tool]:
                     "type": "array",
                     "items": {"type": "string"},
                     "description": f"Valfritt: Lista av plattformar att söka på. Tillgängliga: {', '.join(PLATFORMS.keys())}"
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Hämta färska resultat i stället för cachade (standard: false)",
+                    "default": False
+                },
+                "dedup": {
+                    "type": "boolean",
+                    "description": "Slå ihop samma uppdrag från flera plattformar till en träff med alla länkar (standard: true)",
+                    "default": True
+                },
+                "source": {
+                    "type": "string",
+                    "enum": SOURCES,
+                    "description": "auto (standard): hämta inaktuella plattformar och svara från det lokala jobbindexet, rankat med BM25. index: svara bara från indexet, utan nätverk. live: bara de senaste träffarna från plattformarna",
+                    "default": "auto"
+                },
+                "deadline": {
+                    "type": "number",
+                    "description": f"Sekunder att vänta innan svaret skickas med de plattformar som hunnit svara (standard: {SEARCH_DEADLINE_SECONDS}, 0 väntar på alla)",
+                    "default": SEARCH_DEADLINE_SECONDS
                 }
             },
             required=["query"]
@@ -412,6 +803,27 @@ async def handle_list_tools() -> list[types.Tool]:
                 }
             },
             required=["platform"]
+        ),
+        MCPToolBuilder.create_tool(
+            name="saved_searches",
+            description="Hantera sparade sökningar som hålls uppdaterade i bakgrunden, så att search_konsult svarar direkt från cache och index.",
+            properties={
+                "action": {
+                    "type": "string",
+                    "enum": ["list", "add", "remove"],
+                    "description": "list (standard): visa sökningar som hålls uppdaterade. add/remove: spara eller ta bort en sökning",
+                    "default": "list"
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Sökterm för add/remove"
+                },
+                "location": {
+                    "type": "string",
+                    "description": "Valfri plats för add/remove"
+                }
+            },
+            required=[]
         )
     ]
 
@@ -429,8 +841,30 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[types.Text
         min_price = safe_get_arg(arguments, "min_price", None)
         max_price = safe_get_arg(arguments, "max_price", None)
         platforms = safe_get_arg(arguments, "platforms", None)
-
-        results = await search_all_platforms(query, platforms, location, min_price, max_price)
+        refresh = bool(safe_get_arg(arguments, "refresh", False))
+        dedup = bool(safe_get_arg(arguments, "dedup", True))
+
+        deadline = safe_get_arg(arguments, "deadline", SEARCH_DEADLINE_SECONDS)
+        source = safe_get_arg(arguments, "source", "auto")
+        if source not in SOURCES:
+            return create_error_response(f"Okänd källa: {source}. Tillgängliga: {', '.join(SOURCES)}")
+
+        # Searches made often are crawled more often, so they stay warm
+        if CRAWL_ENABLED:
+            crawler.touch(query, location)
+
+        results = None
+        if source != "index":
+            # Fresh platforms come straight from the cache; stale ones are scraped
+            results = await search_all_platforms(
+                query, platforms, location, min_price, max_price, refresh,
+                deadline=float(deadline) if deadline else None,
+                on_result=progress_reporter()
+            )
+        if source != "live":
+            results = index_results(query, platforms, location, min_price, max_price, live=results)
+        if dedup:
+            results = merge_duplicates(results)
 
         # Format output
         output = [f"# Konsultuppdrag: '{query}'"]
@@ -445,20 +879,26 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[types.Text
         if filters:
             output.append(f"**Filter:** {', '.join(filters)}")
 
-        output.append(f"Sökte {len(results['platforms'])} plattformar, hittade {results['total_jobs']} resultat\n")
+        if source == "index":
+            searched = f"Sökte i lokalt index ({len(results['platforms'])} plattformar)"
+        else:
+            searched = f"Sökte {len(results['platforms'])} plattformar"
+        if source != "index" and results["cached_platforms"]:
+            searched += f" ({results['cached_platforms']} från cache)"
+        searched += f", hittade {results['total_jobs']} resultat"
+        if results.get("duplicates"):
+            searched += f" ({results['duplicates']} dubbletter sammanslagna)"
+        output.append(f"{searched}\n")
+        if results["pending"]:
+            names = ", ".join(PLATFORMS[p]["name"] for p in results["pending"])
+            output.append(f"⏳ Svarade inte i tid: {names}. Sök igen om en stund för att få med dem.")
+
+        if results.get("facets") and results["total_jobs"]:
+            output.append("**Fördelning:**")
+            output.extend(format_facets(results["facets"]))
 
         for platform_id, data in results["platforms"].items():
-            output.append(f"\n## {data['name']} ({data['count']} träffar)")
-            for job in data["jobs"][:5]:  # Show top 5 per platform
-                output.append(f"\n### {job['title']}")
-                if job.get('location'):
-                    output.append(f"📍 {job['location']}")
-                if job.get('price'):
-                    output.append(f"💰 {job['price']} kr/tim")
-                if job.get('description'):
-                    output.append(f"{job['description']}")
-                if job.get('link'):
-                    output.append(f"[Länk]({job['link']})")
+            output.extend(format_platform_result(data))
 
         return create_text_response("\n".join(output))
 
@@ -488,21 +928,61 @@ async def handle_call_tool(name: str, arguments: dict | None) -> list[types.Text
 
         platform = PLATFORMS[platform_id]
         if query:
-            url = platform["search_url"].format(query=quote_plus(query))
-            if location and "location_param" in platform:
-                url += platform["location_param"].format(location=quote_plus(location))
+            url = platform_search_url(platform_id, query, location)
         else:
             url = platform["base_url"]
 
         return create_text_response(f"**{platform['name']}**\n{platform['description']}\n\nURL: {url}")
 
+    elif name == "saved_searches":
+        action = safe_get_arg(arguments, "action", "list")
+        query = safe_get_arg(arguments, "query", "")
+        location = safe_get_arg(arguments, "location", None)
+
+        if action in ("add", "remove"):
+            if not query:
+                return create_error_response("Sökterm (query) krävs")
+            where = f" i {location}" if location else ""
+            if action == "add":
+                crawler.save(query, location)
+                return create_text_response(f"✓ Sparade '{query}'{where}. Den hålls nu uppdaterad i bakgrunden.")
+            if crawler.remove(query, location):
+                return create_text_response(f"✓ Tog bort '{query}'{where} från sparade sökningar.")
+            return create_error_response(f"'{query}'{where} finns inte bland sparade sökningar")
+
+        if action != "list":
+            return create_error_response(f"Okänd action: {action}. Tillgängliga: list, add, remove")
+
+        output = ["# Sökningar som hålls uppdaterade\n"]
+        if not CRAWL_ENABLED:
+            output.append("*Bakgrundshämtning är avstängd (KONSULT_SOK_CRAWL=0).*\n")
+        searches = sorted(crawler.status(), key=lambda s: (not s["saved"], -s["heat"]))
+        if not searches:
+            output.append("Inga sökningar ännu. Spara en med action='add', eller sök med search_konsult.")
+        for search in searches:
+            label = f"'{search['query']}'" + (f" i {search['location']}" if search["location"] else "")
+            kind = "sparad" if search["saved"] else "nyligen sökt"
+            line = f"- {label} ({kind}, värme {search['heat']})"
+            if search["next_crawl_s"] is not None:
+                line += f", nästa hämtning om {search['next_crawl_s'] // 60} min"
+            output.append(line)
+        output.append(f"\nHämtningar sedan start: {crawler.crawls}")
+        return create_text_response("\n".join(output))
+
     return create_error_response(f"Okänt verktyg: {name}")
 
 
 async def main():
     """Run the MCP server."""
-    load_cache()
-    await run_mcp_server(server, "konsult-sok", "1.0.0")
+    if CRAWL_ENABLED:
+        crawler.load_saved()
+        crawler.start()
+    try:
+        await run_mcp_server(server, "konsult-sok", "1.0.0")
+    finally:
+        await crawler.stop()
+        await close_session()
+        close_parse_pool()
 
 
 if __name__ == "__main__":
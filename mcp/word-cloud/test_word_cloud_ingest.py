@@ -0,0 +1,59 @@
+"""
+Tests for the streaming tokenizer in word_cloud_ingest.
+Run with: python -m unittest test_word_cloud_ingest (or pytest) from this directory.
+"""
+
+import unittest
+
+from word_cloud_ingest import MAX_TOKEN_LENGTH, TOKEN_PATTERN, iter_tokens
+
+
+def chunked(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class IterTokensTest(unittest.TestCase):
+    def assert_streams(self, separator: str):
+        """Tokens are yielded while the stream is read, not only when it ends."""
+        read = 0
+
+        def chunks():
+            nonlocal read
+            for _ in range(2000):
+                read += 1
+                yield ("python" + separator) * 1000
+
+        tokens = iter_tokens(chunks())
+        self.assertEqual(next(tokens), "python")
+        self.assertEqual(read, 1)
+        self.assertEqual(1 + sum(1 for _ in tokens), 2_000_000)
+
+    def test_cr_only_input_streams(self):
+        self.assert_streams("\r")
+
+    def test_nbsp_only_input_streams(self):
+        self.assert_streams(" ")
+
+    def test_tokens_split_across_chunks(self):
+        text = "node.js\rc++ ci/cd o'neil, Göteborg;x-ray " * 50
+        expected = [m.group() for m in TOKEN_PATTERN.finditer(text)]
+        for size in (1, 2, 3, 5, 7, 64):
+            self.assertEqual(list(iter_tokens(chunked(text, size))), expected)
+
+    def test_run_without_breaks_is_bounded(self):
+        # A run with no break is flushed instead of carried until the stream ends
+        read = 0
+
+        def chunks():
+            nonlocal read
+            for _ in range(100):
+                read += 1
+                yield "a" * 100
+
+        tokens = iter_tokens(chunks())
+        next(tokens)
+        self.assertLessEqual(read, MAX_TOKEN_LENGTH // 100 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load test for the word cloud server.
+Drives handle_call_tool with synthetic mutations on clouds of growing size while
+simulated browsers follow the SSE stream of a local HTTP instance.
+
+Everything runs in a temporary directory on localhost, so no network access is needed
+and real clouds are left untouched.
+
+Usage:
+    python word_cloud_bench.py
+    python word_cloud_bench.py --sizes 1000,10000 --subscribers 50 --mutations 100
+    python word_cloud_bench.py --startup
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import word_cloud_server as wcs
+
+CATEGORIES = list(wcs.CATEGORIES)
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """p50/p95/p99/max of a list of values."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": ordered[-1]}
+
+
+def synthetic_cloud(size: int, rng: random.Random) -> dict:
+    """A cloud with `size` words and about half as many connections."""
+    start = datetime(2025, 1, 1)
+    words = [
+        {
+            "word": f"word{i}",
+            "description": "",
+            "category": rng.choice(CATEGORIES),
+            "size": rng.randint(1, 10),
+            "added": (start + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(size)
+    ]
+    connections = {}
+    for _ in range(size // 2):
+        a, b = rng.randrange(size), rng.randrange(size)
+        if a != b:
+            connections[(a, b)] = {
+                "source": f"word{a}",
+                "target": f"word{b}",
+                "label": "",
+                "added": (start + timedelta(seconds=size)).isoformat(),
+            }
+    return {"words": words, "connections": list(connections.values()), "last_update": None}
+
+
+class Subscriber:
+    """A simulated browser following /api/events."""
+
+    def __init__(self, port: int, cloud: str):
+        self.connection = http.client.HTTPConnection("localhost", port, timeout=60)
+        self.connection.request("GET", f"/c/{cloud}/api/events")
+        # The connection hands its socket to the response; keep it to shut the stream down
+        self.socket = self.connection.sock
+        self.response = self.connection.getresponse()
+        self.events: list[float] = []  # Arrival time of each event
+        self.bytes = 0
+        self.changed = threading.Condition()
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        try:
+            while True:
+                line = self.response.readline()
+                if not line:
+                    return
+                self.bytes += len(line)
+                if line.startswith(b"data: "):
+                    with self.changed:
+                        self.events.append(time.perf_counter())
+                        self.changed.notify_all()
+        except (OSError, ValueError):
+            return
+
+    def wait_for(self, count: int, timeout: float) -> float | None:
+        """Wait until `count` events have arrived; returns the arrival time of that event."""
+        deadline = time.perf_counter() + timeout
+        with self.changed:
+            while len(self.events) < count:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self.changed.wait(remaining)
+            return self.events[count - 1]
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        # The reader sees end of stream and exits before the response is closed under it
+        self.thread.join(timeout=5)
+        self.response.close()
+
+
+def random_mutation(rng: random.Random, cloud: str, size: int, step: int) -> tuple[str, dict]:
+    """Mixed workload: new words, updates, connections and removals."""
+    roll = rng.random()
+    if roll < 0.5:
+        return "add_word", {"cloud": cloud, "word": f"bench{step}", "size": rng.randint(1, 10)}
+    if roll < 0.7:
+        return "add_word", {"cloud": cloud, "word": f"word{rng.randrange(size)}", "description": "updated"}
+    if roll < 0.9:
+        return "add_connection", {"cloud": cloud, "source": f"word{rng.randrange(size)}",
+                                  "target": f"word{rng.randrange(size)}", "label": "bench"}
+    return "remove_word", {"cloud": cloud, "word": f"word{rng.randrange(size)}"}
+
+
+def run_size(size: int, args, loop: asyncio.AbstractEventLoop, port: int) -> dict:
+    rng = random.Random(size)
+    name = f"bench-{size}"
+    path = wcs.CloudStore.path_for(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(synthetic_cloud(size, rng), f)
+
+    started = time.perf_counter()
+    wcs.clouds.get(name)
+    load_seconds = time.perf_counter() - started
+
+    def call(tool, arguments):
+        # Errors such as removing an already removed word are part of the workload
+        loop.run_until_complete(wcs.handle_call_tool(tool, arguments))
+
+    # Mutation latency with all subscribers attached but not waited for
+    subscribers = [Subscriber(port, name) for _ in range(args.subscribers)]
+    for s in subscribers:
+        s.wait_for(1, args.timeout)
+    received_before = [len(s.events) for s in subscribers]
+    bytes_before = sum(s.bytes for s in subscribers)
+
+    latencies = []
+    for step in range(args.mutations):
+        tool, arguments = random_mutation(rng, name, size, step)
+        started = time.perf_counter()
+        call(tool, arguments)
+        latencies.append((time.perf_counter() - started) * 1000)
+    # Let the fan-out of the burst drain before counting
+    time.sleep(args.settle)
+    burst_events = sum(len(s.events) - n for s, n in zip(subscribers, received_before))
+    burst_bytes = sum(s.bytes for s in subscribers) - bytes_before
+
+    # Fan-out latency: one mutation at a time, waiting for every subscriber to see it
+    fanout = []
+    missed = 0
+    for step in range(args.fanout_mutations):
+        counts = [len(s.events) for s in subscribers]
+        started = time.perf_counter()
+        call("add_word", {"cloud": name, "word": f"fanout{step}"})
+        for s, count in zip(subscribers, counts):
+            arrived = s.wait_for(count + 1, args.timeout)
+            if arrived is None:
+                missed += 1
+            else:
+                fanout.append((arrived - started) * 1000)
+
+    for s in subscribers:
+        s.close()
+    result = {
+        "words": size,
+        "load_s": round(load_seconds, 3),
+        "mutation_ms": {k: round(v, 2) for k, v in percentiles(latencies).items()},
+        "fanout_ms": {k: round(v, 2) for k, v in percentiles(fanout).items()},
+        "fanout_missed": missed,
+        "subscribers": args.subscribers,
+        "events_per_subscriber": round(burst_events / max(args.subscribers, 1), 1),
+        "bytes_per_update": round(burst_bytes / max(args.mutations, 1)),
+        "rss_mb": round(rss_mb(), 1),
+    }
+
+    # Free the cloud before the next size
+    with wcs.clouds.lock:
+        cloud = wcs.clouds.clouds.pop(name, None)
+    if cloud is not None:
+        cloud.stop_layout()
+    return result
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def measure_startup(size: int, directory: str, format: str) -> dict:
+    """
+    Start the server as Claude Desktop does (a subprocess speaking MCP over stdio) with
+    a default cloud of `size` words, and time the handshake and the first tool response.
+    """
+    data_dir = Path(directory) / f"startup-{size}"
+    data_dir.mkdir()
+    with open(data_dir / "words.json", "w") as f:
+        json.dump(synthetic_cloud(size, random.Random(size)), f)
+    env = {**os.environ, "WORD_CLOUD_DATA_DIR": str(data_dir), "WORD_CLOUD_PORT": str(free_port()),
+           "WORD_CLOUD_FORMAT": format}
+
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, str(Path(wcs.__file__))], env=env, stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def request(message: dict) -> dict | None:
+        process.stdin.write((json.dumps(message) + "\n").encode())
+        process.stdin.flush()
+        if "id" not in message:
+            return None
+        while True:
+            line = process.stdout.readline()
+            if not line:
+                raise RuntimeError("Server exited during startup")
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue  # Stray output that is not an MCP message
+            if reply.get("id") == message["id"]:
+                return reply
+
+    try:
+        request({"jsonrpc": "2.0", "id": 1, "method": "initialize",
+                 "params": {"protocolVersion": "2024-11-05", "capabilities": {},
+                            "clientInfo": {"name": "word-cloud-bench", "version": "0"}}})
+        initialized = time.perf_counter()
+        request({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        request({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        listed = time.perf_counter()
+        request({"jsonrpc": "2.0", "id": 3, "method": "tools/call",
+                 "params": {"name": "list_categories", "arguments": {}}})
+        called = time.perf_counter()
+    finally:
+        process.stdin.close()
+        process.terminate()
+        process.wait(timeout=10)
+
+    return {
+        "words": size,
+        "initialize_ms": round((initialized - started) * 1000, 1),
+        "tools_list_ms": round((listed - started) * 1000, 1),
+        "first_tool_ms": round((called - started) * 1000, 1),
+    }
+
+
+def print_startup(r: dict):
+    print(f"{r['words']:>9,} words  initialize {r['initialize_ms']:.0f} ms  "
+          f"tools/list {r['tools_list_ms']:.0f} ms  first tool call {r['first_tool_ms']:.0f} ms")
+
+
+def print_result(r: dict):
+    m, f = r["mutation_ms"], r["fanout_ms"]
+    print(f"\n{r['words']:,} words (loaded in {r['load_s']} s)")
+    print(f"  mutation latency  p50 {m['p50']:.2f} ms  p95 {m['p95']:.2f} ms  "
+          f"p99 {m['p99']:.2f} ms  max {m['max']:.2f} ms")
+    if r["subscribers"]:
+        print(f"  fan-out latency   p50 {f['p50']:.2f} ms  p95 {f['p95']:.2f} ms  "
+              f"p99 {f['p99']:.2f} ms  max {f['max']:.2f} ms  ({r['fanout_missed']} missed)")
+        print(f"  SSE traffic       {r['bytes_per_update']:,} bytes per update to "
+              f"{r['subscribers']} subscribers, {r['events_per_subscriber']} events each")
+    print(f"  RSS               {r['rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="Comma-separated cloud sizes in words (default: 1000,10000,100000)")
+    parser.add_argument("--mutations", type=int, default=100, help="Mutations per size for latency (default: 100)")
+    parser.add_argument("--fanout-mutations", type=int, default=20,
+                        help="Mutations per size for fan-out latency (default: 20)")
+    parser.add_argument("--subscribers", type=int, default=10, help="Simulated SSE subscribers (default: 10)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for an SSE event (default: 60)")
+    parser.add_argument("--settle", type=float, default=1.0,
+                        help="Seconds to let SSE traffic drain after the mutation burst (default: 1)")
+    parser.add_argument("--format", choices=["json", "compact"], default=wcs.STORAGE_FORMAT,
+                        help="Storage format to benchmark")
+    parser.add_argument("--startup", action="store_true",
+                        help="Measure time from process start to the first MCP responses instead")
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this file")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    if args.startup:
+        print(f"Word cloud startup: time from process start, {args.format} storage")
+        with tempfile.TemporaryDirectory(prefix="word-cloud-bench-") as directory:
+            results = []
+            for size in sizes:
+                result = measure_startup(size, directory, args.format)
+                print_startup(result)
+                results.append(result)
+        write_results(results, args.json_path)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="word-cloud-bench-") as directory:
+        wcs.WORDS_FILE = Path(directory) / "words.json"
+        wcs.CLOUDS_DIR = Path(directory) / "clouds"
+        wcs.STORAGE_FORMAT = args.format
+        wcs.clouds.memory_budget = float("inf")
+
+        httpd = ThreadingHTTPServer(("localhost", 0), wcs.http_handler_class())
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        port = httpd.server_address[1]
+
+        print(f"Word cloud benchmark: {args.mutations} mutations, {args.subscribers} subscribers, "
+              f"{args.format} storage, RSS at start {rss_mb():.1f} MB")
+        loop = asyncio.new_event_loop()
+        results = []
+        try:
+            for size in sizes:
+                result = run_size(size, args, loop, port)
+                print_result(result)
+                results.append(result)
+        finally:
+            loop.close()
+            httpd.shutdown()
+
+    write_results(results, args.json_path)
+
+
+def write_results(results: list[dict], path: str | None):
+    if path:
+        with open(path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Compact binary snapshot format for word clouds.
+Stores words and connections as columns: strings as one UTF-8 blob with offsets,
+categories as ids into an interned table and timestamps as epoch microseconds. Timestamps
+are naive local times, so they are stored as wall-clock microseconds since 1970-01-01
+and need no time zone lookups either way.
+Files are about a third the size of the JSON and are written several times faster.
+Loading maps the file and parses only the header: words and connections are ColumnRows,
+which decode a column the first time any row needs it and build a row's dict only when
+the row is accessed.
+
+Layout:
+    b"WCB1", uint32 header length, JSON header, column data
+
+The header lists the category table, row counts and the (offset, length) of every
+column. Fields that do not fit a column (unknown keys, None or other non-string values,
+unparseable timestamps) are kept per row in the header's "extra" maps, and the rows
+where a column's key was absent are listed in "missing", so any cloud round-trips
+unchanged.
+"""
+
+import json
+import mmap
+import struct
+import sys
+import warnings
+from array import array
+from bisect import bisect_left
+from collections.abc import Hashable, Iterable, Iterator, MutableMapping, MutableSequence
+from datetime import datetime, timedelta
+from itertools import accumulate
+from pathlib import Path
+from typing import Callable
+
+MAGIC = b"WCB1"
+SUFFIX = ".wcb"
+NO_TIME = -(1 << 63)
+EPOCH = datetime(1970, 1, 1)
+
+WORD_STRINGS = ("word", "description")
+CONNECTION_STRINGS = ("source", "target", "label")
+WORD_FIELDS = {"word", "description", "category", "size", "added", "updated"}
+CONNECTION_FIELDS = {"source", "target", "label", "added"}
+# Absent timestamps are stored as NO_TIME and left out when read, so need no "missing" entry
+TIME_FIELDS = {"added", "updated"}
+
+
+def _to_micros(value) -> int | None:
+    """ISO timestamp -> epoch microseconds, or None if it cannot be stored exactly."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    # Time zones and non-canonical spellings would not survive the round trip
+    if parsed.tzinfo is not None or parsed.isoformat() != value:
+        return None
+    delta = parsed - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def _from_micros(micros: int) -> str:
+    return (EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def _numpy():
+    """NumPy if installed, imported on first use so server startup does not pay for it."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _parse_times(texts: list) -> list[int]:
+    """Convert a column of isoformat() strings to microseconds, NO_TIME where not possible."""
+    np = _numpy()
+    if np is not None and texts and all(type(t) is str for t in texts):
+        try:
+            with warnings.catch_warnings():
+                # Time zone suffixes are parsed with a warning; the round-trip check rejects them
+                warnings.simplefilter("ignore")
+                micros = np.array(texts, dtype="datetime64[us]").view(np.int64)
+        except ValueError:
+            pass  # Some value is not a timestamp; sort it out one by one
+        else:
+            # Keep only values that format back to exactly the same string
+            if _format_times(micros) == texts:
+                return micros.tolist()
+    values = []
+    for text in texts:
+        micros = _to_micros(text)
+        values.append(NO_TIME if micros is None else micros)
+    return values
+
+
+def _format_times(values) -> list[str | None]:
+    """Format a timestamp column as isoformat() strings, None where missing."""
+    np = _numpy()
+    if np is None:
+        return [None if v == NO_TIME else _from_micros(v) for v in values]
+    micros = np.frombuffer(values, dtype=np.int64)
+    missing = (micros == NO_TIME).tolist()
+    whole = (micros % 1_000_000 == 0).tolist()
+    # NO_TIME is NumPy's NaT, so it formats without error
+    texts = np.datetime_as_string(micros.view("datetime64[us]"), unit="us").tolist()
+    # isoformat() leaves out a zero fraction
+    return [None if gap else text[:-7] if round_second else text
+            for text, gap, round_second in zip(texts, missing, whole)]
+
+
+class _Writer:
+    def __init__(self):
+        self.columns: dict[str, tuple[int, int]] = {}
+        self.chunks: list[bytes] = []
+        self.offset = 0
+
+    def add(self, name: str, data: bytes):
+        self.columns[name] = (self.offset, len(data))
+        self.chunks.append(data)
+        self.offset += len(data)
+
+    def add_array(self, name: str, typecode: str, values):
+        values = array(typecode, values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        self.add(name, values.tobytes())
+
+    def add_strings(self, name: str, values: list[str]):
+        # Offsets are in characters of the decoded blob, so reading needs one decode per column
+        offsets = array("Q", [0])
+        offsets.extend(accumulate(map(len, values)))
+        if sys.byteorder == "big":
+            offsets.byteswap()
+        self.add(f"{name}.offsets", offsets.tobytes())
+        self.add(name, "".join(values).encode("utf-8", "surrogatepass"))
+
+
+def dump(data: dict, path: Path):
+    """Write a cloud in the compact format. Writes to a temporary file first."""
+    words = list(iter_rows(data.get("words", [])))
+    connections = list(iter_rows(data.get("connections", [])))
+    categories: dict[str, int] = {}
+    writer = _Writer()
+    extra_words: dict[str, dict] = {}
+    extra_connections: dict[str, dict] = {}
+    missing_words: dict[str, list[int]] = {}
+    missing_connections: dict[str, list[int]] = {}
+
+    def extras(entry: dict, fields: set, i: int, target: dict):
+        if not entry.keys() <= fields:
+            target[str(i)] = {k: v for k, v in entry.items() if k not in fields}
+
+    def absent(entries: list[dict], fields: set, target: dict):
+        for field in sorted(fields):
+            rows = [i for i, entry in enumerate(entries) if field not in entry]
+            if rows:
+                target[field] = rows
+
+    def texts(entries: list[dict], key: str, target: dict) -> list[str]:
+        """A string column; other values (such as None) go to the extra map."""
+        values = []
+        for i, entry in enumerate(entries):
+            value = entry.get(key, "")
+            if not isinstance(value, str):
+                target.setdefault(str(i), {})[key] = value
+                value = ""
+            values.append(value)
+        return values
+
+    def times(entries: list[dict], key: str, target: dict) -> list[int]:
+        values = _parse_times([entry.get(key) for entry in entries])
+        for i, (entry, micros) in enumerate(zip(entries, values)):
+            if micros == NO_TIME and key in entry:
+                target.setdefault(str(i), {})[key] = entry[key]
+        return values
+
+    for i, w in enumerate(words):
+        extras(w, WORD_FIELDS, i, extra_words)
+    for i, c in enumerate(connections):
+        extras(c, CONNECTION_FIELDS, i, extra_connections)
+    absent(words, WORD_FIELDS - TIME_FIELDS, missing_words)
+    absent(connections, CONNECTION_FIELDS - TIME_FIELDS, missing_connections)
+
+    for key in WORD_STRINGS:
+        writer.add_strings(f"words.{key}", texts(words, key, extra_words))
+    category_ids = [categories.setdefault(category, len(categories))
+                    for category in texts(words, "category", extra_words)]
+    writer.add_array("words.category", "H", category_ids)
+    sizes = []
+    for i, w in enumerate(words):
+        size = w.get("size", 0)
+        if type(size) is int and 0 <= size < 256:
+            sizes.append(size)
+        else:
+            sizes.append(0)
+            extra_words.setdefault(str(i), {})["size"] = size
+    writer.add_array("words.size", "B", sizes)
+    writer.add_array("words.added", "q", times(words, "added", extra_words))
+    writer.add_array("words.updated", "q", times(words, "updated", extra_words))
+
+    for key in CONNECTION_STRINGS:
+        writer.add_strings(f"connections.{key}", texts(connections, key, extra_connections))
+    writer.add_array("connections.added", "q", times(connections, "added", extra_connections))
+
+    header = {
+        "words": len(words),
+        "connections": len(connections),
+        "categories": list(categories),
+        "last_update": data.get("last_update"),
+        "columns": writer.columns,
+        "extra": {"words": extra_words, "connections": extra_connections},
+        "missing": {"words": missing_words, "connections": missing_connections},
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for chunk in writer.chunks:
+            f.write(chunk)
+    temporary.replace(path)
+
+
+def _map(path: Path):
+    """The file's content, memory-mapped where possible."""
+    if sys.platform == "win32":
+        # Windows cannot replace or rename a mapped file, which saving a cloud does
+        return path.read_bytes()
+    with open(path, "rb") as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""  # Empty files cannot be mapped
+
+
+class _Columns:
+    """Columns of a mapped file, each read and decoded on first use."""
+
+    def __init__(self, content, base: int, columns: dict):
+        self.content = content
+        self.base = base
+        self.columns = columns
+        self.cache = {}
+
+    def raw(self, name: str) -> bytes:
+        offset, length = self.columns[name]
+        return self.content[self.base + offset:self.base + offset + length]
+
+    def numbers(self, name: str, typecode: str) -> array:
+        values = self.cache.get(name)
+        if values is None:
+            values = array(typecode)
+            values.frombytes(self.raw(name))
+            if sys.byteorder == "big":
+                values.byteswap()
+            self.cache[name] = values
+        return values
+
+    def strings(self, name: str) -> tuple[str, array]:
+        """The column as one string and the character offsets of its values."""
+        values = self.cache.get(name)
+        if values is None:
+            values = str(self.raw(name), "utf-8", "surrogatepass"), self.numbers(f"{name}.offsets", "Q")
+            self.cache[name] = values
+        return values
+
+    def string(self, name: str, i: int) -> str:
+        text, offsets = self.strings(name)
+        return text[offsets[i]:offsets[i + 1]]
+
+    def time(self, name: str, i: int) -> str | None:
+        micros = self.numbers(name, "q")[i]
+        return None if micros == NO_TIME else _from_micros(micros)
+
+    def all_strings(self, name: str) -> list[str]:
+        text, offsets = self.strings(name)
+        return [text[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    def all_times(self, name: str) -> list[str | None]:
+        return _format_times(self.numbers(name, "q"))
+
+
+class _RowDecoder:
+    """Builds the rows of one table: column values in order, then extra fields, minus absent keys."""
+
+    def __init__(self, columns: list[tuple[str, Callable[[int], object], Callable[[], list]]],
+                 extra: dict, missing: dict):
+        """
+        Args:
+            columns: Per field, its value in one row and its values in all rows
+            extra: Header "extra" map of the table
+            missing: Header "missing" map of the table
+        """
+        self.columns = columns
+        self.extra = {int(i): fields for i, fields in extra.items()}
+        self.missing = {field: array("q", rows) for field, rows in missing.items() if field not in TIME_FIELDS}
+
+    def row(self, i: int, fields: tuple | None = None) -> dict:
+        """Row i, with only `fields` if given."""
+        entry = {}
+        for field, one, _ in self.columns:
+            if fields is None or field in fields:
+                value = one(i)
+                if value is not None:
+                    entry[field] = value
+        return self._finish(i, entry, fields)
+
+    def rows(self, indices: Iterable[int], fields: tuple | None = None) -> Iterator[dict]:
+        """Rows at indices; whole columns are decoded at once, which is faster for many rows."""
+        columns = [(field, every()) for field, _, every in self.columns if fields is None or field in fields]
+        special = set(self.extra).union(*self.missing.values())
+        for i in indices:
+            entry = {field: values[i] for field, values in columns if values[i] is not None}
+            yield self._finish(i, entry, fields) if i in special else entry
+
+    def _finish(self, i: int, entry: dict, fields: tuple | None) -> dict:
+        for field, value in self.extra.get(i, {}).items():
+            if fields is None or field in fields:
+                entry[field] = value
+        for field, rows in self.missing.items():
+            position = bisect_left(rows, i)
+            if position < len(rows) and rows[position] == i:
+                entry.pop(field, None)
+        return entry
+
+
+class ColumnRows(MutableSequence):
+    """
+    Rows of a compact file, decoded from the columns when accessed.
+
+    An accessed row is kept as a dict, so changes to it stick like in a list. Rows that
+    are never accessed cost no memory beyond the columns they are read from.
+    """
+
+    def __init__(self, decoder: _RowDecoder, items: list):
+        """
+        Args:
+            decoder: Builds rows from the file's columns
+            items: Per position, the row's index in the file or its decoded dict
+        """
+        self._decoder = decoder
+        self._items = items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if type(item) is int:
+            item = self._items[index] = self._decoder.row(item)
+        return item
+
+    def __setitem__(self, index, value):
+        self._items[index] = list(value) if isinstance(index, slice) else value
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def insert(self, index: int, value: dict):
+        self._items.insert(index, value)
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self._items)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"<ColumnRows of {len(self._items)} rows>"
+
+    def peek(self, fields: tuple | None = None) -> Iterator[dict]:
+        """
+        Rows for reading: rows not yet accessed are decoded without being kept, with only
+        `fields` if given. Changes to them are lost.
+        """
+        items = list(self._items)
+        undecoded = self._decoder.rows((item for item in items if type(item) is int), fields)
+        for item in items:
+            yield next(undecoded) if type(item) is int else item
+
+    def select(self, keep: Callable[[dict], bool], fields: tuple | None = None) -> "ColumnRows":
+        """The rows for which keep(row) is true, still undecoded. keep sees only `fields` of undecoded rows."""
+        return ColumnRows(self._decoder, [item for item, row in zip(self._items, self.peek(fields)) if keep(row)])
+
+    def by_key(self, key: Callable[[dict], Hashable], fields: tuple | None = None) -> "RowIndex":
+        """Map key(row) to rows without decoding them; see RowIndex."""
+        return RowIndex(self, {key(row): i for i, row in enumerate(self.peek(fields))})
+
+
+class RowIndex(MutableMapping):
+    """
+    Map from keys to the rows of a ColumnRows, decoding a row when it is looked up.
+    Positions stay valid as long as rows are only appended.
+    """
+
+    def __init__(self, rows: ColumnRows, positions: dict):
+        self._rows = rows
+        self._positions = positions  # Key -> position in rows, or the row itself once set
+
+    def __getitem__(self, key) -> dict:
+        value = self._positions[key]
+        return self._rows[value] if type(value) is int else value
+
+    def __setitem__(self, key, row: dict):
+        self._positions[key] = row
+
+    def __delitem__(self, key):
+        del self._positions[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._positions
+
+    def __iter__(self) -> Iterator:
+        return iter(self._positions)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+def iter_rows(rows, fields: tuple | None = None) -> Iterable[dict]:
+    """Rows for reading only; see ColumnRows.peek(). Plain lists are returned as they are."""
+    return rows.peek(fields) if isinstance(rows, ColumnRows) else rows
+
+
+def select(rows, keep: Callable[[dict], bool], fields: tuple | None = None):
+    """The rows for which keep(row) is true, keeping column-backed rows undecoded."""
+    if isinstance(rows, ColumnRows):
+        return rows.select(keep, fields)
+    return [row for row in rows if keep(row)]
+
+
+def by_key(rows, key: Callable[[dict], Hashable], fields: tuple | None = None) -> MutableMapping:
+    """Map key(row) to rows, like a dict comprehension, without decoding column-backed rows."""
+    if isinstance(rows, ColumnRows):
+        return rows.by_key(key, fields)
+    return {key(row): row for row in rows}
+
+
+def json_default(value):
+    """json.dumps() default hook that writes ColumnRows as lists without keeping the decoded rows."""
+    if isinstance(value, ColumnRows):
+        return list(value.peek())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def load(path: Path) -> dict:
+    """
+    Read a cloud written by dump(). The file is memory-mapped and only its header is
+    parsed; words and connections are ColumnRows that decode rows as they are accessed.
+    """
+    content = _map(path)
+    if content[:4] != MAGIC:
+        raise ValueError(f"{path} is not a compact word cloud file")
+    (header_length,) = struct.unpack("<I", content[4:8])
+    header = json.loads(content[8:8 + header_length])
+    data = _Columns(content, 8 + header_length, header["columns"])
+    categories = [sys.intern(c) for c in header["categories"]]
+    # Files written before absent keys were recorded have no "missing" map
+    missing = header.get("missing", {"words": {}, "connections": {}})
+
+    words = _RowDecoder([
+        ("word", lambda i: data.string("words.word", i), lambda: data.all_strings("words.word")),
+        ("description", lambda i: data.string("words.description", i), lambda: data.all_strings("words.description")),
+        ("category", lambda i: categories[data.numbers("words.category", "H")[i]],
+         lambda: [categories[c] for c in data.numbers("words.category", "H")]),
+        ("size", lambda i: data.numbers("words.size", "B")[i], lambda: data.numbers("words.size", "B").tolist()),
+        ("added", lambda i: data.time("words.added", i), lambda: data.all_times("words.added")),
+        ("updated", lambda i: data.time("words.updated", i), lambda: data.all_times("words.updated")),
+    ], header["extra"]["words"], missing["words"])
+    connections = _RowDecoder([
+        ("source", lambda i: data.string("connections.source", i), lambda: data.all_strings("connections.source")),
+        ("target", lambda i: data.string("connections.target", i), lambda: data.all_strings("connections.target")),
+        ("label", lambda i: data.string("connections.label", i), lambda: data.all_strings("connections.label")),
+        ("added", lambda i: data.time("connections.added", i), lambda: data.all_times("connections.added")),
+    ], header["extra"]["connections"], missing["connections"])
+
+    return {
+        "words": ColumnRows(words, list(range(header["words"]))),
+        "connections": ColumnRows(connections, list(range(header["connections"]))),
+        "last_update": header["last_update"],
+    }
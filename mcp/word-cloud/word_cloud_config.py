@@ -0,0 +1,127 @@
+"""
+Claude Desktop config discovery for the word cloud.
+The config is parsed only when its modification time or size changes, and a watcher
+thread reports servers added to or removed from it, so the cloud can follow the config
+without manual add_mcp_servers calls.
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+from pathlib import Path
+from typing import Callable
+
+CONFIG_NAME = "claude_desktop_config.json"
+
+
+def get_claude_config_path() -> Path | None:
+    """Get Claude Desktop config path based on OS. WORD_CLOUD_CLAUDE_CONFIG overrides it."""
+    override = os.getenv("WORD_CLOUD_CLAUDE_CONFIG")
+    if override:
+        return Path(override).expanduser()
+
+    system = platform.system()
+    if system == "Darwin":  # macOS
+        return Path.home() / "Library" / "Application Support" / "Claude" / CONFIG_NAME
+    elif system == "Windows":
+        appdata = os.getenv("APPDATA")
+        if appdata:
+            return Path(appdata) / "Claude" / CONFIG_NAME
+        return None
+    # Linux and other XDG systems
+    config_home = os.getenv("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(config_home) / "Claude" / CONFIG_NAME
+
+
+class ConfigReader:
+    """Installed MCP servers from the Claude Desktop config, cached on the file's mtime and size."""
+
+    def __init__(self, locate: Callable[[], Path | None] = get_claude_config_path):
+        self.locate = locate
+        self.lock = threading.Lock()
+        self.key = None
+        self.servers: list[str] | None = None
+
+    def _stat_key(self) -> tuple | None:
+        path = self.locate()
+        if path is None:
+            return None
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (path, stat.st_mtime_ns, stat.st_size)
+
+    def read(self) -> list[str] | None:
+        """
+        Names of the MCP servers in the config.
+
+        Returns:
+            The server names, or None if the config is missing or cannot be parsed
+            (e.g. while it is being written)
+        """
+        key = self._stat_key()
+        if key is None:
+            return None
+        with self.lock:
+            if key == self.key:
+                return self.servers
+
+        try:
+            with open(key[0], "r", encoding="utf-8") as f:
+                config = json.load(f)
+            servers = list(config.get("mcpServers", {}))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Error reading Claude config: {e}", file=sys.stderr)
+            servers = None
+
+        with self.lock:
+            self.key = key
+            self.servers = servers
+        return servers
+
+
+class ConfigWatcher:
+    """Background thread that polls the config and reports added and removed servers."""
+
+    def __init__(self, reader: ConfigReader, on_change: Callable[[list[str], list[str]], None],
+                 interval: float = 5.0):
+        """
+        Args:
+            reader: Config reader; polling only stats the file until it changes
+            on_change: Receives (added, removed) server names
+            interval: Seconds between polls
+        """
+        self.reader = reader
+        self.on_change = on_change
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start watching. Servers already in the config are taken as the starting point."""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="word-cloud-config", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stop watching."""
+        self.stopped.set()
+
+    def _run(self):
+        known = self.reader.read()
+        while not self.stopped.wait(self.interval):
+            servers = self.reader.read()
+            # A missing or half-written config is not taken to mean the servers were removed
+            if servers is None or servers == known:
+                continue
+            previous, current = set(known or []), set(servers)
+            added = [s for s in servers if s not in previous]
+            removed = [s for s in known or [] if s not in current]
+            known = servers
+            try:
+                self.on_change(added, removed)
+            except Exception as e:
+                print(f"MCP server sync failed: {e}", file=sys.stderr)
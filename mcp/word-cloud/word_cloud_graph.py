@@ -0,0 +1,238 @@
+"""
+Adjacency-list index over the word cloud's connections.
+Kept in sync incrementally with word_cloud_data so graph queries never rescan the connection list.
+"""
+
+from collections import deque
+
+
+class ConnectionGraph:
+    """
+    Directed graph of words (nodes) and connections (edges).
+
+    Nodes are keyed by lowercased word; `names` keeps the original casing for output.
+    Derived results (components, PageRank) are cached until the graph changes.
+    """
+
+    def __init__(self):
+        self.names: dict[str, str] = {}
+        self.out_edges: dict[str, dict[str, None]] = {}
+        self.in_edges: dict[str, dict[str, None]] = {}
+        self.edge_count = 0
+        self.version = 0
+        self._cache: dict[str, tuple[int, object]] = {}
+
+    def rebuild(self, words: list[dict], connections: list[dict]):
+        """Rebuild the index from scratch, e.g. after loading or clearing the cloud."""
+        self.names = {}
+        self.out_edges = {}
+        self.in_edges = {}
+        self.edge_count = 0
+        for w in words:
+            self.add_node(w["word"])
+        for c in connections:
+            self.add_edge(c["source"], c["target"])
+        self.version += 1
+
+    def add_node(self, word: str):
+        """Add a word to the graph."""
+        key = word.lower()
+        if key not in self.names:
+            self.names[key] = word
+            self.out_edges[key] = {}
+            self.in_edges[key] = {}
+            self.version += 1
+
+    def remove_node(self, word: str):
+        """Remove a word and all its connections."""
+        key = word.lower()
+        if key not in self.names:
+            return
+        for target in self.out_edges.pop(key):
+            if target != key:
+                del self.in_edges[target][key]
+            self.edge_count -= 1
+        for source in self.in_edges.pop(key):
+            if source != key:
+                del self.out_edges[source][key]
+                self.edge_count -= 1
+        del self.names[key]
+        self.version += 1
+
+    def add_edge(self, source: str, target: str):
+        """Add a directed connection. Unknown words are added as nodes."""
+        self.add_node(source)
+        self.add_node(target)
+        s, t = source.lower(), target.lower()
+        if t not in self.out_edges[s]:
+            self.out_edges[s][t] = None
+            self.in_edges[t][s] = None
+            self.edge_count += 1
+            self.version += 1
+
+    def remove_edge(self, source: str, target: str):
+        """Remove a directed connection if present."""
+        s, t = source.lower(), target.lower()
+        if s in self.out_edges and t in self.out_edges[s]:
+            del self.out_edges[s][t]
+            del self.in_edges[t][s]
+            self.edge_count -= 1
+            self.version += 1
+
+    def _cached(self, name: str, compute):
+        """Return a derived result, recomputing it only if the graph has changed."""
+        entry = self._cache.get(name)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, compute())
+            self._cache[name] = entry
+        return entry[1]
+
+    def _neighbours(self, key: str, direction: str):
+        if direction == "out":
+            return self.out_edges[key]
+        if direction == "in":
+            return self.in_edges[key]
+        return list(self.out_edges[key]) + list(self.in_edges[key])
+
+    def shortest_path(self, source: str, target: str, directed: bool = True) -> list[str] | None:
+        """
+        Find a shortest path between two words with breadth-first search.
+
+        Args:
+            source: Start word
+            target: End word
+            directed: Follow connections only in their direction
+
+        Returns:
+            List of words from source to target, or None if unreachable
+        """
+        s, t = source.lower(), target.lower()
+        if s not in self.names or t not in self.names:
+            return None
+
+        direction = "out" if directed else "both"
+        parents = {s: None}
+        queue = deque([s])
+        while queue:
+            node = queue.popleft()
+            if node == t:
+                path = []
+                while node is not None:
+                    path.append(self.names[node])
+                    node = parents[node]
+                return path[::-1]
+            for neighbour in self._neighbours(node, direction):
+                if neighbour not in parents:
+                    parents[neighbour] = node
+                    queue.append(neighbour)
+        return None
+
+    def neighbourhood(self, word: str, hops: int = 1, direction: str = "both") -> dict[int, list[str]] | None:
+        """
+        Collect the words within a number of hops.
+
+        Args:
+            word: Centre word
+            hops: Maximum distance
+            direction: "out", "in" or "both"
+
+        Returns:
+            Mapping of distance (1..hops) to words at that distance, or None if the word is unknown
+        """
+        start = word.lower()
+        if start not in self.names:
+            return None
+
+        seen = {start}
+        frontier = [start]
+        rings = {}
+        for distance in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbour in self._neighbours(node, direction):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            rings[distance] = [self.names[n] for n in next_frontier]
+            frontier = next_frontier
+        return rings
+
+    def components(self) -> list[list[str]]:
+        """Weakly connected components, largest first."""
+        return self._cached("components", self._compute_components)
+
+    def _compute_components(self) -> list[list[str]]:
+        seen = set()
+        result = []
+        for start in self.names:
+            if start in seen:
+                continue
+            seen.add(start)
+            component = []
+            queue = deque([start])
+            while queue:
+                node = queue.popleft()
+                component.append(self.names[node])
+                for neighbour in self._neighbours(node, "both"):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+            result.append(component)
+        result.sort(key=len, reverse=True)
+        return result
+
+    def degrees(self) -> dict[str, tuple[int, int]]:
+        """Map each word to its (in-degree, out-degree)."""
+        return {self.names[k]: (len(self.in_edges[k]), len(self.out_edges[k])) for k in self.names}
+
+    def pagerank(self, damping: float = 0.85, max_iterations: int = 100, tolerance: float = 1e-8) -> dict[str, float]:
+        """PageRank of every word. Dangling words spread their rank evenly."""
+        return self._cached("pagerank", lambda: self._compute_pagerank(damping, max_iterations, tolerance))
+
+    def _compute_pagerank(self, damping: float, max_iterations: int, tolerance: float) -> dict[str, float]:
+        keys = list(self.names)
+        n = len(keys)
+        if n == 0:
+            return {}
+        index = {key: i for i, key in enumerate(keys)}
+        out_degree = [len(self.out_edges[k]) for k in keys]
+
+        # Imported here rather than at module level so server startup does not pay for NumPy
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+        if np is not None:
+            src = np.fromiter((index[s] for s in keys for _ in self.out_edges[s]), dtype=np.int64, count=self.edge_count)
+            dst = np.fromiter((index[t] for s in keys for t in self.out_edges[s]), dtype=np.int64, count=self.edge_count)
+            out_deg = np.array(out_degree, dtype=float)
+            dangling = out_deg == 0
+            share = np.divide(1.0, out_deg, out=np.zeros(n), where=~dangling)
+            rank = np.full(n, 1.0 / n)
+            for _ in range(max_iterations):
+                spread = np.bincount(dst, weights=rank[src] * share[src], minlength=n)
+                new_rank = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+                converged = np.abs(new_rank - rank).sum() < tolerance
+                rank = new_rank
+                if converged:
+                    break
+            return {self.names[k]: float(r) for k, r in zip(keys, rank)}
+
+        rank = [1.0 / n] * n
+        for _ in range(max_iterations):
+            dangling_sum = sum(r for r, d in zip(rank, out_degree) if d == 0)
+            base = (1 - damping) / n + damping * dangling_sum / n
+            new_rank = [base] * n
+            for i, key in enumerate(keys):
+                if out_degree[i]:
+                    share = damping * rank[i] / out_degree[i]
+                    for target in self.out_edges[key]:
+                        new_rank[index[target]] += share
+            converged = sum(abs(a - b) for a, b in zip(new_rank, rank)) < tolerance
+            rank = new_rank
+            if converged:
+                break
+        return {self.names[k]: r for k, r in zip(keys, rank)}
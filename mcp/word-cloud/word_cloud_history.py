@@ -0,0 +1,302 @@
+"""
+Edit history for a word cloud.
+Every change is appended to a compact operation log, and periodic snapshots are indexed
+by time, so the cloud as it looked at any moment can be rebuilt from the nearest
+snapshot plus the few operations after it.
+
+Files, next to the cloud's JSON file:
+    <name>.history.jsonl   one operation per line: [epoch, op, args...]
+    <name>.snapshots.jsonl one snapshot per line
+    <name>.history.idx     one line per snapshot: "<epoch> <log offset> <snapshot offset>"
+"""
+
+import bisect
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from word_cloud_compact import iter_rows
+
+# Minimum operations between snapshots. Snapshots are also spaced by at least the size of
+# the state, so they never take up much more space than the log itself.
+SNAPSHOT_INTERVAL = 500
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse epoch seconds or an ISO 8601 timestamp."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _epoch(iso: str | None, default: float) -> int:
+    try:
+        return int(datetime.fromisoformat(iso).timestamp())
+    except (TypeError, ValueError):
+        return int(default)
+
+
+def _iso(epoch: int | None) -> str | None:
+    return datetime.fromtimestamp(epoch).isoformat() if epoch is not None else None
+
+
+class HistoryState:
+    """Cloud state rebuilt from the log, keyed for fast replay."""
+
+    def __init__(self):
+        # lowercased word -> [word, description, category, size, added, updated]
+        self.words: dict[str, list] = {}
+        # (source, target) lowercased -> [source, target, label, added]
+        self.connections: dict[tuple[str, str], list] = {}
+
+    def apply(self, op: list):
+        """Apply one logged operation."""
+        t, kind = op[0], op[1]
+        if kind == "w":
+            _, _, word, description, category, size = op
+            existing = self.words.get(word.lower())
+            if existing:
+                existing[1:4] = [description, category, size]
+                existing[5] = t
+            else:
+                self.words[word.lower()] = [word, description, category, size, t, None]
+        elif kind == "w-":
+            key = op[2].lower()
+            self.words.pop(key, None)
+            self.connections = {k: c for k, c in self.connections.items() if key not in k}
+        elif kind == "c":
+            _, _, source, target, label = op
+            existing = self.connections.get((source.lower(), target.lower()))
+            if existing:
+                existing[2] = label
+            else:
+                self.connections[(source.lower(), target.lower())] = [source, target, label, t]
+        elif kind == "c-":
+            self.connections.pop((op[2].lower(), op[3].lower()), None)
+        elif kind == "x":
+            self.words = {}
+            self.connections = {}
+
+    def to_compact(self) -> dict:
+        return {"w": list(self.words.values()), "c": list(self.connections.values())}
+
+    @classmethod
+    def from_compact(cls, data: dict) -> "HistoryState":
+        state = cls()
+        state.words = {w[0].lower(): w for w in data["w"]}
+        state.connections = {(c[0].lower(), c[1].lower()): c for c in data["c"]}
+        return state
+
+    def to_cloud(self, at: float | None = None) -> dict:
+        """Convert to the word_cloud_data format served by /api/words."""
+        words = []
+        for word, description, category, size, added, updated in self.words.values():
+            entry = {"word": word, "description": description, "category": category,
+                     "size": size, "added": _iso(added)}
+            if updated is not None:
+                entry["updated"] = _iso(updated)
+            words.append(entry)
+        connections = [
+            {"source": s, "target": t, "label": label, "added": _iso(added)}
+            for s, t, label, added in self.connections.values()
+        ]
+        return {"words": words, "connections": connections,
+                "last_update": _iso(int(at)) if at is not None else None}
+
+
+class HistoryLog:
+    """Append-only operation log with a time-indexed snapshot file."""
+
+    def __init__(self, data_path: Path):
+        """
+        Args:
+            data_path: The cloud's JSON file; history files are stored next to it
+        """
+        stem = data_path.with_suffix("")
+        self.log_path = Path(f"{stem}.history.jsonl")
+        self.snapshot_path = Path(f"{stem}.snapshots.jsonl")
+        self.index_path = Path(f"{stem}.history.idx")
+        self.pending: list[list] = []
+        # Parallel lists, one entry per snapshot
+        self.snapshot_times: list[int] = []
+        self.snapshot_entries: list[tuple[int, int]] = []  # (log offset, snapshot offset)
+        self.ops_since_snapshot = 0
+        self.state_size = 0
+        # The cloud's data while it has no log on disk, see open()
+        self.unseeded: dict | None = None
+
+    def open(self, data: dict):
+        """
+        Read the snapshot index. A cloud without history gets one seeded from the
+        added/updated timestamps already stored in its words and connections; the seed
+        is kept in memory and only written on the first change (see before_change()),
+        so viewing a cloud creates no files.
+        """
+        self.snapshot_times = []
+        self.snapshot_entries = []
+        self.unseeded = None
+        if self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                for line in f:
+                    t, log_offset, snapshot_offset = map(int, line.split())
+                    self.snapshot_times.append(t)
+                    self.snapshot_entries.append((log_offset, snapshot_offset))
+
+        self.state_size = len(data.get("words", [])) + len(data.get("connections", []))
+        if not self.log_path.exists():
+            self.unseeded = data
+            self.ops_since_snapshot = 0
+            return
+
+        # Count operations written since the last snapshot
+        start = self.snapshot_entries[-1][0] if self.snapshot_entries else 0
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            self.ops_since_snapshot = sum(1 for _ in f)
+
+    @staticmethod
+    def _seed_lines(data: dict) -> list[bytes]:
+        now = time.time()
+        ops = []
+        for w in iter_rows(data.get("words", [])):
+            ops.append([_epoch(w.get("added"), now), "w", w["word"], w.get("description", ""),
+                        w.get("category", "koncept"), w.get("size", 5)])
+        for c in iter_rows(data.get("connections", [])):
+            ops.append([_epoch(c.get("added"), now), "c", c["source"], c["target"], c.get("label", "")])
+        ops.sort(key=lambda op: op[0])
+        return [(json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8") for op in ops]
+
+    def before_change(self):
+        """Write the seeded log of a cloud without history. Call before changing its data."""
+        if self.unseeded is None:
+            return
+        lines = self._seed_lines(self.unseeded)
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "wb") as f:
+            f.writelines(lines)
+        self.ops_since_snapshot = len(lines)
+        self.unseeded = None
+
+    def record(self, kind: str, *args):
+        """Queue an operation; it is written on the next flush()."""
+        self.pending.append([int(time.time()), kind, *args])
+
+    def flush(self, data: dict):
+        """Append queued operations and write a snapshot when enough have accumulated."""
+        if not self.pending:
+            return
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            for op in self.pending:
+                f.write(json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n")
+            log_offset = f.tell()
+        last_time = self.pending[-1][0]
+        self.ops_since_snapshot += len(self.pending)
+        self.pending = []
+        self.state_size = len(data["words"]) + len(data["connections"])
+
+        if self.ops_since_snapshot >= max(SNAPSHOT_INTERVAL, self.state_size):
+            self._write_snapshot(last_time, log_offset)
+
+    def _write_snapshot(self, t: int, log_offset: int):
+        # Rebuild from history rather than trusting the live data, so the snapshot is
+        # exactly the state the log describes at this offset
+        state = self._state_at_offset(log_offset)
+        with open(self.snapshot_path, "a", encoding="utf-8") as f:
+            snapshot_offset = f.tell()
+            f.write(json.dumps(state.to_compact(), ensure_ascii=False, separators=(",", ":")) + "\n")
+        with open(self.index_path, "a") as f:
+            f.write(f"{t} {log_offset} {snapshot_offset}\n")
+        self.snapshot_times.append(t)
+        self.snapshot_entries.append((log_offset, snapshot_offset))
+        self.ops_since_snapshot = 0
+
+    def _load_snapshot(self, position: int) -> tuple[HistoryState, int]:
+        """Load snapshot number `position` (-1 for none). Returns the state and its log offset."""
+        if position < 0:
+            return HistoryState(), 0
+        log_offset, snapshot_offset = self.snapshot_entries[position]
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            f.seek(snapshot_offset)
+            return HistoryState.from_compact(json.loads(f.readline())), log_offset
+
+    def _iter_ops(self, start: int, end: int | None = None) -> Iterator[list]:
+        if self.unseeded is not None:
+            # No log on disk yet; read the seed it would be written with
+            offset = 0
+            for line in self._seed_lines(self.unseeded):
+                offset += len(line)
+                if offset <= start:
+                    continue
+                if end is not None and offset > end:
+                    return
+                yield json.loads(line)
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if end is not None and f.tell() > end:
+                    return
+                yield json.loads(line)
+
+    def _state_at_offset(self, log_offset: int) -> HistoryState:
+        position = bisect.bisect_right([e[0] for e in self.snapshot_entries], log_offset) - 1
+        state, start = self._load_snapshot(position)
+        for op in self._iter_ops(start, log_offset):
+            state.apply(op)
+        return state
+
+    def state_at(self, at: float) -> dict:
+        """
+        Rebuild the cloud as it was at a point in time.
+
+        Finds the last snapshot taken at or before `at` (binary search) and replays
+        only the operations logged after it.
+        """
+        position = bisect.bisect_right(self.snapshot_times, at) - 1
+        state, start = self._load_snapshot(position)
+        for op in self._iter_ops(start):
+            if op[0] > at:
+                break
+            state.apply(op)
+        return state.to_cloud(at)
+
+    def log_size(self) -> int:
+        """Bytes written to the log so far."""
+        if self.unseeded is not None:
+            return sum(map(len, self._seed_lines(self.unseeded)))
+        return self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    def replay(self, start: float | None = None, end: float | None = None,
+               frames: int = 200, limit: int | None = None) -> Iterator[tuple[int, dict]]:
+        """
+        Yield (epoch, cloud) states showing how the cloud grew.
+
+        Operations are grouped so at most about `frames` states are produced. Pass
+        `limit` (from log_size()) to read a consistent log while it is being appended to.
+        """
+        if start is not None:
+            position = bisect.bisect_right(self.snapshot_times, start) - 1
+            state, offset = self._load_snapshot(position)
+        else:
+            state, offset = HistoryState(), 0
+
+        total = sum(1 for _ in self._iter_ops(offset, limit))
+        step = max(1, total // max(frames, 1))
+        pending = 0
+        last_time = None
+        for op in self._iter_ops(offset, limit):
+            if end is not None and op[0] > end:
+                break
+            state.apply(op)
+            last_time = op[0]
+            if start is not None and op[0] < start:
+                continue
+            pending += 1
+            if pending >= step:
+                pending = 0
+                yield last_time, state.to_cloud(last_time)
+        if pending and last_time is not None:
+            yield last_time, state.to_cloud(last_time)
@@ -0,0 +1,314 @@
+"""
+Text ingestion for the word cloud.
+Streams text through a tokenizer and a bounded-memory frequency sketch, so corpora
+of any size can be turned into words with sizes on the cloud's 1-10 scale.
+"""
+
+import math
+import re
+from collections import Counter, deque
+from pathlib import Path
+from typing import Iterable, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Letters first, then letters/digits and the joiners found in tech terms (c++, c#, ci/cd, node.js)
+TOKEN_PATTERN = re.compile(r"[^\W\d_](?:[\w+#/.'-]*[\w+#])?")
+# Any character that cannot be part of a token: whitespace of any kind, punctuation
+TOKEN_BREAK = re.compile(r"[^\w+#/.'-]")
+# Runs without a break longer than this are not words; they are tokenized without waiting for the rest
+MAX_TOKEN_LENGTH = 256
+
+CHUNK_SIZE = 1 << 20  # 1 MiB
+# Tokens per vectorized co-occurrence batch
+BATCH_TOKENS = 1 << 20
+
+STOP_WORDS = {
+    "sv": frozenset("""
+        alla allt alltid andra annan annat att av bara bli blir blev bör dag de dem den denna
+        denne dess dessa det detta dig din dina ditt du där då efter ej eller en ens er era ert
+        ett fast fick fler flera för före från får ganska genom ha hade han hans har hela helt
+        henne hennes hit hon honom hur här hos i icke ingen inget inom inte jag ju kan kanske
+        kom kommer kunde man med mellan men mer mest mig min mina mitt mot mycket många måste
+        ned nej ni nu när någon något några och också om oss på redan samma sedan sig sin sina
+        sitt sjäv själv ska skall skulle som så sådan sådana till tills tog under upp ut utan
+        var vad vara varit varför varje vars vart vem vi vid vilka vilken vilket vill våra vårt
+        än ännu är även åt över
+    """.split()),
+    "en": frozenset("""
+        a about above after again against all also am an and any are as at be because been
+        before being below between both but by can could did do does doing down during each
+        few for from further had has have having he her here hers herself him himself his how
+        i if in into is it its itself just let me more most my myself no nor not now of off on
+        once only or other our ours ourselves out over own same she should so some such than
+        that the their theirs them themselves then there these they this those through to too
+        under until up us very was we were what when where which while who whom why will with
+        would you your yours yourself yourselves
+    """.split()),
+}
+
+
+def stop_words_for(language: str) -> frozenset:
+    """Stop words for 'sv', 'en' or 'auto' (both)."""
+    if language == "auto":
+        return STOP_WORDS["sv"] | STOP_WORDS["en"]
+    if language not in STOP_WORDS:
+        raise ValueError(f"Unsupported language: {language}. Use 'sv', 'en' or 'auto'")
+    return STOP_WORDS[language]
+
+
+def read_chunks(path: str | Path, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Read a text file in fixed-size chunks."""
+    with open(Path(path).expanduser(), "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_tokens(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Yield tokens from a stream of text chunks.
+
+    A token cut off at the end of a chunk is carried over and joined with the next chunk.
+    At most MAX_TOKEN_LENGTH characters are carried, so memory stays bounded whatever
+    separates the words.
+    """
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        # Hold back everything after the last break; it may continue in the next chunk.
+        # Searching the reversed tail finds it without scanning the whole chunk.
+        tail = text[-MAX_TOKEN_LENGTH:]
+        match = TOKEN_BREAK.search(tail[::-1])
+        if match:
+            cut = len(text) - match.start()
+        else:
+            cut = len(text) if len(tail) == MAX_TOKEN_LENGTH else 0
+        carry = text[cut:]
+        for match in TOKEN_PATTERN.finditer(text, 0, cut):
+            yield match.group()
+    if carry:
+        for match in TOKEN_PATTERN.finditer(carry):
+            yield match.group()
+
+
+class MisraGries:
+    """
+    Misra-Gries heavy-hitters sketch.
+
+    Keeps at most `capacity` counters. Every word that makes up more than
+    1/(capacity + 1) of the stream is guaranteed to be kept, and each count is
+    underestimated by at most total / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.surface: dict[str, str] = {}  # First seen casing of each tracked word
+        self.total = 0
+
+    def add(self, key: str, surface: str):
+        """Count one occurrence of key."""
+        self.total += 1
+        counts = self.counts
+        if key in counts:
+            counts[key] += 1
+        elif len(counts) < self.capacity:
+            counts[key] = 1
+            self.surface[key] = surface
+        else:
+            # Decrement every counter; drop the ones that reach zero
+            for other in list(counts):
+                if counts[other] == 1:
+                    del counts[other]
+                    del self.surface[other]
+                else:
+                    counts[other] -= 1
+
+    @property
+    def error_bound(self) -> int:
+        """Maximum underestimate of any count."""
+        return self.total // (self.capacity + 1)
+
+    def top(self, n: int) -> list[tuple[str, int]]:
+        """The n most frequent words as (surface form, count)."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))[:n]
+        return [(self.surface[key], count) for key, count in ranked]
+
+
+def count_words(chunks: Iterable[str], language: str = "auto", min_length: int = 3,
+                capacity: int = 1000) -> MisraGries:
+    """
+    Stream text through the tokenizer and stop-word filter into a frequency sketch.
+
+    Args:
+        chunks: Text chunks, e.g. from read_chunks() or [text]
+        language: 'sv', 'en' or 'auto'
+        min_length: Ignore shorter tokens
+        capacity: Number of counters in the sketch
+
+    Returns:
+        The filled sketch
+    """
+    stop_words = stop_words_for(language)
+    sketch = MisraGries(capacity)
+    for token in iter_tokens(chunks):
+        if len(token) < min_length:
+            continue
+        key = token.lower()
+        if key in stop_words:
+            continue
+        sketch.add(key, token)
+    return sketch
+
+
+def scale_sizes(counts: list[tuple[str, int]]) -> dict[str, int]:
+    """Map counts to the 1-10 size scale logarithmically, so a few very common words do not flatten the rest."""
+    if not counts:
+        return {}
+    low = math.log(min(c for _, c in counts))
+    high = math.log(max(c for _, c in counts))
+    if high == low:
+        return {word: 5 for word, _ in counts}
+    return {word: 1 + round(9 * (math.log(count) - low) / (high - low)) for word, count in counts}
+
+
+def _count_pairs_python(ids: Iterable[int], window: int, pair_counts: Counter):
+    """Count co-occurring id pairs with a sliding window (fallback without NumPy)."""
+    recent = deque(maxlen=window)
+    for current in ids:
+        if current >= 0:
+            for other in recent:
+                if other >= 0 and other != current:
+                    pair_counts[(min(other, current), max(other, current))] += 1
+        recent.append(current)
+
+
+def _count_pairs_numpy(ids: "np.ndarray", skip: int, window: int, vocab_size: int, pair_counts: Counter):
+    """
+    Count co-occurring id pairs in a batch with one vectorized pass per window offset.
+
+    The first `skip` ids are carried over from the previous batch; only pairs whose
+    later token lies after them are counted, so no pair is counted twice.
+    """
+    n = len(ids)
+    keys = []
+    for offset in range(1, window + 1):
+        start = max(offset, skip)
+        if start >= n:
+            break
+        left = ids[start - offset:n - offset]
+        right = ids[start:n]
+        mask = (left >= 0) & (right >= 0) & (left != right)
+        low = np.minimum(left[mask], right[mask]).astype(np.int64)
+        high = np.maximum(left[mask], right[mask]).astype(np.int64)
+        keys.append(low * vocab_size + high)
+    if not keys:
+        return
+    unique, counts = np.unique(np.concatenate(keys), return_counts=True)
+    for key, count in zip(unique.tolist(), counts.tolist()):
+        pair_counts[divmod(key, vocab_size)] += count
+
+
+def cooccurrence_edges(chunks: Iterable[str], vocabulary: Iterable[str], language: str = "auto",
+                       min_length: int = 3, window: int = 5, top_k: int = 3,
+                       min_count: int = 2) -> list[tuple[str, str, float, int]]:
+    """
+    Derive connections between vocabulary words from windowed co-occurrence in a text stream.
+
+    Pairs are scored with normalized PMI (-1..1) and each word keeps at most top_k edges,
+    strongest first.
+
+    Args:
+        chunks: Text chunks, e.g. from read_chunks() or [text]
+        vocabulary: Words that may be connected (matched case-insensitively)
+        language: Stop-word language; stop words do not take up window positions
+        min_length: Ignore shorter tokens
+        window: Number of following tokens a word co-occurs with
+        top_k: Maximum edges per word
+        min_count: Ignore pairs co-occurring fewer times than this
+
+    Returns:
+        List of (source, target, npmi, count); the more frequent word is the source
+    """
+    stop_words = stop_words_for(language)
+    vocab = sorted({word.lower() for word in vocabulary})
+    ids = {word: i for i, word in enumerate(vocab)}
+    if len(vocab) < 2:
+        return []
+
+    def token_ids():
+        for token in iter_tokens(chunks):
+            if len(token) < min_length:
+                continue
+            key = token.lower()
+            if key not in stop_words:
+                yield ids.get(key, -1)
+
+    unigram = [0] * len(vocab)
+    pair_counts = Counter()
+
+    if np is None:
+        def counted():
+            for i in token_ids():
+                if i >= 0:
+                    unigram[i] += 1
+                yield i
+        _count_pairs_python(counted(), window, pair_counts)
+    else:
+        carry = np.empty(0, dtype=np.int32)
+        batch = []
+
+        def flush(carry, batch):
+            array = np.concatenate([carry, np.array(batch, dtype=np.int32)])
+            _count_pairs_numpy(array, len(carry), window, len(vocab), pair_counts)
+            return array[-window:]
+
+        for i in token_ids():
+            if i >= 0:
+                unigram[i] += 1
+            batch.append(i)
+            if len(batch) >= BATCH_TOKENS:
+                carry = flush(carry, batch)
+                batch = []
+        if batch:
+            flush(carry, batch)
+
+    total_pairs = sum(pair_counts.values())
+    if not total_pairs:
+        return []
+
+    # Marginals come from the pair counts themselves so NPMI stays within -1..1
+    marginal = [0] * len(vocab)
+    for (a, b), count in pair_counts.items():
+        marginal[a] += count
+        marginal[b] += count
+
+    scored = []
+    for (a, b), count in pair_counts.items():
+        if count < min_count:
+            continue
+        p_ab = count / (2 * total_pairs)
+        pmi = math.log(count * 2 * total_pairs / (marginal[a] * marginal[b]))
+        npmi = pmi / -math.log(p_ab)
+        if npmi > 0:
+            scored.append((npmi, count, a, b))
+
+    # Greedily keep the strongest edges while both ends have room left
+    scored.sort(key=lambda item: (-item[0], -item[1], item[2], item[3]))
+    degree = [0] * len(vocab)
+    edges = []
+    for npmi, count, a, b in scored:
+        if degree[a] >= top_k or degree[b] >= top_k:
+            continue
+        degree[a] += 1
+        degree[b] += 1
+        if unigram[b] > unigram[a]:
+            a, b = b, a
+        edges.append((vocab[a], vocab[b], round(npmi, 3), count))
+    return edges
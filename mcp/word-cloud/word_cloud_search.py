@@ -0,0 +1,241 @@
+"""
+Prefix and fuzzy search over the words in a cloud.
+A sorted key list answers prefix queries by binary search, and a trigram index finds
+candidates for fuzzy matches, which are then ranked by edit distance. Both are kept
+in sync incrementally with word_cloud_data.
+"""
+
+import bisect
+from collections import Counter
+from collections.abc import MutableMapping
+
+# Trigrams shared by more words than this carry little signal and are only used when
+# a query has nothing rarer
+COMMON_GRAM_LIMIT = 2000
+# Candidates ranked by edit distance per requested result
+CANDIDATES_PER_RESULT = 4
+# A word extending another counts as a near-duplicate when both have at least this many
+# characters and the shorter is at least this fraction of the longer
+MIN_PREFIX_DUPLICATE = 4
+PREFIX_DUPLICATE_RATIO = 0.6
+
+
+def trigrams(key: str) -> set[str]:
+    """Trigrams of a padded key, so short words and word edges also get grams."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def fold(key: str) -> str:
+    """Key with only letters and digits kept, so "node.js" and "nodejs" compare equal."""
+    return "".join(c for c in key if c.isalnum())
+
+
+def pattern_masks(pattern: str) -> dict[str, int]:
+    """Bit mask of the positions of each character in pattern, for edit_distance()."""
+    masks = {}
+    for i, c in enumerate(pattern):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks
+
+
+def edit_distance(a: str, b: str, limit: int, masks: dict[str, int] | None = None) -> int:
+    """
+    Levenshtein distance with adjacent transpositions counted as one edit, computed
+    bit-parallel (Hyyro's variant of Myers' algorithm): one pass over b with a few
+    integer operations per character.
+
+    Args:
+        a: Pattern
+        b: Text to compare with
+        limit: Distances above this are reported as limit + 1, allowing an early exit
+        masks: pattern_masks(a), when comparing a against many words
+
+    Returns:
+        The distance, or limit + 1 if it exceeds limit
+    """
+    m, n = len(a), len(b)
+    if abs(m - n) > limit:
+        return limit + 1
+    if m == 0:
+        return min(n, limit + 1)
+    if masks is None:
+        masks = pattern_masks(a)
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn, d0, previous_eq = full, 0, 0, 0
+    score = m
+    for j, c in enumerate(b):
+        eq = masks.get(c, 0)
+        transposed = (((~d0) & eq) << 1) & previous_eq
+        d0 = ((((eq & vp) + vp) ^ vp) | eq | vn | transposed) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = d0 & vp
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        # The score drops by at most one per remaining character
+        if score - (n - j - 1) > limit:
+            return limit + 1
+        x = ((hp << 1) | 1) & full
+        vn = x & d0
+        vp = ((hn << 1) | ~(x | d0)) & full
+        previous_eq = eq
+    return min(score, limit + 1)
+
+
+class WordIndex:
+    """
+    Search index over the words of one cloud.
+
+    Keys are lowercased words; `entries` maps them to the word entries in word_cloud_data,
+    which are updated in place, so results carry the current category and size.
+    """
+
+    def __init__(self):
+        self.entries: MutableMapping[str, dict] = {}
+        self.keys: list[str] = []  # Sorted, for prefix search
+        self.grams: dict[str, set[str]] = {}
+        self.folded: dict[str, set[str]] = {}
+
+    def rebuild(self, entries: MutableMapping[str, dict]):
+        """Rebuild the index from scratch from lowercased words and their entries, e.g. after loading the cloud."""
+        self.entries = entries
+        self.keys = sorted(self.entries)
+        self.grams = {}
+        self.folded = {}
+        for key in self.keys:
+            for gram in trigrams(key):
+                self.grams.setdefault(gram, set()).add(key)
+            self.folded.setdefault(fold(key), set()).add(key)
+
+    def add(self, entry: dict):
+        """Add a word entry to the index."""
+        key = entry["word"].lower()
+        if key in self.entries:
+            return
+        self.entries[key] = entry
+        bisect.insort(self.keys, key)
+        for gram in trigrams(key):
+            self.grams.setdefault(gram, set()).add(key)
+        self.folded.setdefault(fold(key), set()).add(key)
+
+    def remove(self, word: str):
+        """Remove a word from the index."""
+        key = word.lower()
+        if self.entries.pop(key, None) is None:
+            return
+        del self.keys[bisect.bisect_left(self.keys, key)]
+        for gram in trigrams(key):
+            keys = self.grams[gram]
+            keys.discard(key)
+            if not keys:
+                del self.grams[gram]
+        keys = self.folded[fold(key)]
+        keys.discard(key)
+        if not keys:
+            del self.folded[fold(key)]
+
+    def prefix(self, prefix: str, limit: int) -> list[str]:
+        """Words starting with prefix, shortest first."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        matches = []
+        # Scan a bounded window so very common prefixes stay cheap
+        for key in self.keys[start:start + limit * 20]:
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+        matches.sort(key=lambda k: (len(k), k))
+        return [self.entries[k]["word"] for k in matches[:limit]]
+
+    def fuzzy(self, query: str, limit: int, max_distance: int | None = None) -> list[tuple[str, int]]:
+        """
+        Words within an edit distance of query, closest first.
+
+        Args:
+            query: Text to match
+            limit: Maximum number of results
+            max_distance: Maximum edit distance (default: a third of the query length, at least 1)
+
+        Returns:
+            List of (word, distance)
+        """
+        key = query.lower()
+        if max_distance is None:
+            max_distance = max(1, len(key) // 3)
+
+        postings = sorted((self.grams.get(gram, ()) for gram in trigrams(key)), key=len)
+        postings = [p for p in postings if p]
+        if not postings:
+            return []
+        rare = [p for p in postings if len(p) <= COMMON_GRAM_LIMIT] or postings[:1]
+
+        overlap = Counter()
+        for posting in rare:
+            overlap.update(posting)
+        candidates = [k for k, _ in overlap.most_common(limit * CANDIDATES_PER_RESULT)]
+
+        masks = pattern_masks(key)
+        results = []
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, max_distance, masks)
+            if distance <= max_distance:
+                results.append((distance, -overlap[candidate], candidate))
+        results.sort()
+        return [(self.entries[k]["word"], d) for d, _, k in results[:limit]]
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, str, int]]:
+        """
+        Combined search: exact match, then prefix matches, then fuzzy matches.
+
+        Returns:
+            List of (word, "exact" | "prefix" | "fuzzy", edit distance)
+        """
+        key = query.lower()
+        results = []
+        seen = set()
+        if key in self.entries:
+            results.append((self.entries[key]["word"], "exact", 0))
+            seen.add(key)
+        for word in self.prefix(key, limit):
+            if word.lower() not in seen:
+                results.append((word, "prefix", len(word) - len(key)))
+                seen.add(word.lower())
+        if len(results) < limit:
+            for word, distance in self.fuzzy(key, limit):
+                if word.lower() not in seen:
+                    results.append((word, "fuzzy", distance))
+                    seen.add(word.lower())
+        return results[:limit]
+
+    def near_duplicates(self, word: str, limit: int = 5) -> list[str]:
+        """
+        Existing words that look like the same term as word, e.g. "Postgres" for
+        "PostgreSQL" or "Node.js" for "NodeJS". The word itself is not included.
+        """
+        key = word.lower()
+        found = {}
+
+        def similar_length(a: str, b: str) -> bool:
+            return min(len(a), len(b)) >= PREFIX_DUPLICATE_RATIO * max(len(a), len(b))
+
+        # Same letters and digits, different punctuation or spacing
+        for other in self.folded.get(fold(key), ()):
+            found[other] = None
+        # Typos and spelling variants
+        for other, _ in self.fuzzy(key, limit, max_distance=max(1, len(key) // 4)):
+            found[other.lower()] = None
+        # One word extending the other ("postgres" / "postgresql")
+        for i in range(MIN_PREFIX_DUPLICATE, len(key)):
+            if key[:i] in self.entries and similar_length(key[:i], key):
+                found[key[:i]] = None
+        if len(key) >= MIN_PREFIX_DUPLICATE:
+            for other in self.prefix(key, limit + 1):
+                if similar_length(other, key):
+                    found[other.lower()] = None
+
+        found.pop(key, None)
+        return [self.entries[k]["word"] for k in list(found)[:limit]]
@@ -7,11 +7,18 @@ Adds words to a cloud and displays them on a local web page.
 import os
 import sys
 import asyncio
+import gzip
+import hashlib
 import json
+import re
 import threading
-import webbrowser
+import time
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Iterator
 from urllib.parse import parse_qs, urlparse
 from datetime import datetime
 
@@ -21,14 +28,46 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from mcp.server import Server
 import mcp.types as types
 from mcp_common import create_text_response, create_error_response, run_mcp_server, safe_get_arg, MCPToolBuilder
+import word_cloud_compact
+from word_cloud_config import ConfigReader, ConfigWatcher
+from word_cloud_graph import ConnectionGraph
+from word_cloud_history import HistoryLog, parse_timestamp
+from word_cloud_search import WordIndex
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
-# Global state
-WORDS_FILE = Path(__file__).parent / "words.json"
-SERVER_PORT = 8765
-word_cloud_data = {"words": [], "connections": [], "last_update": None}
 
-sse_clients = []
+# Global state
+DATA_DIR = Path(os.getenv("WORD_CLOUD_DATA_DIR", Path(__file__).parent))
+WORDS_FILE = DATA_DIR / "words.json"  # The default cloud
+CLOUDS_DIR = DATA_DIR / "clouds"      # Other named clouds, one JSON file each
+HTML_FILE = Path(__file__).parent / "index.html"
+SERVER_PORT = int(os.getenv("WORD_CLOUD_PORT", "8765"))
+DEFAULT_CLOUD = "default"
+CLOUD_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Loaded clouds are evicted least-recently-used once their combined file size exceeds this
+MEMORY_BUDGET_BYTES = int(float(os.getenv("WORD_CLOUD_MEMORY_MB", "256")) * 1024 * 1024)
+
+# "json" (pretty-printed, the default) or "compact" (binary columns, see word_cloud_compact.py).
+# Compact clouds are memory-mapped and their rows decoded when used. Clouds stored in the
+# other format are migrated on load.
+STORAGE_FORMAT = os.getenv("WORD_CLOUD_FORMAT", "json")
+
+# Responses below this size are not worth compressing
+MIN_COMPRESS_SIZE = 512
+
+# Changes within this window are sent to SSE clients as one update
+SSE_COALESCE_SECONDS = float(os.getenv("WORD_CLOUD_SSE_WINDOW_MS", "50")) / 1000
+# Updates queued per SSE client; a slow client skips the oldest and gets the latest
+SSE_QUEUE_SIZE = max(1, int(os.getenv("WORD_CLOUD_SSE_QUEUE", "2")))
+# Seconds between checks of the Claude Desktop config for added or removed MCP servers.
+# Off (0) unless set: the sync deletes words from the default cloud.
+MCP_SYNC_SECONDS = float(os.getenv("WORD_CLOUD_MCP_SYNC_SECONDS", "0"))
+MCP_SYNC_SIZE = 7
 
 # Category definitions - logical grouping
 CATEGORIES = {
@@ -88,121 +127,780 @@ CATEGORIES = {
     }
 }
 
-def auto_categorize(word: str, description: str = "") -> str:
-    """Automatically categorize a word based on keywords."""
-    word_lower = word.lower()
-    desc_lower = description.lower()
 
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword occurring in a text in a single pass."""
+
+    def __init__(self, keywords: dict[str, int]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Mapping of keyword to priority (lower wins)
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.best = [None]  # Best priority of any keyword ending in each state
+
+        for keyword, priority in keywords.items():
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(None)
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            if self.best[state] is None or priority < self.best[state]:
+                self.best[state] = priority
+
+        # Breadth-first pass to set failure links and merge suffix matches
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and char not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[child] = self.goto[fallback].get(char, 0)
+                inherited = self.best[self.fail[child]]
+                if inherited is not None and (self.best[child] is None or inherited < self.best[child]):
+                    self.best[child] = inherited
+
+    def search(self, text: str) -> int | None:
+        """Return the best priority of any keyword found in text, or None."""
+        goto, fail, best = self.goto, self.fail, self.best
+        state = 0
+        found = None
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if best[state] is not None and (found is None or best[state] < found):
+                found = best[state]
+                if found == 0:
+                    break
+        return found
+
+
+_category_keys: list[str] = []
+_exact_keywords: dict[str, int] = {}
+_keyword_matcher: KeywordMatcher | None = None
+
+
+def build_category_matcher():
+    """Compile CATEGORIES into the keyword matcher. Call again after changing CATEGORIES."""
+    global _category_keys, _exact_keywords, _keyword_matcher
+    _category_keys = list(CATEGORIES.keys())
+
+    # A keyword listed in several categories belongs to the first one
+    keywords = {}
+    for rank, info in enumerate(CATEGORIES.values()):
+        for keyword in info["keywords"]:
+            keywords.setdefault(keyword.lower(), rank)
+
+    _exact_keywords = keywords
+    _keyword_matcher = KeywordMatcher(keywords)
+    _categorize.cache_clear()
+
+
+@lru_cache(maxsize=8192)
+def _categorize(word_lower: str, desc_lower: str) -> str:
+    """Cached categorization of an already lowercased word and description."""
     # Check if description matches a category directly
     if desc_lower in CATEGORIES:
         return desc_lower
 
-    # Check keywords for each category
-    for category, info in CATEGORIES.items():
-        if word_lower in info["keywords"]:
-            return category
-        # Check if any keyword is in the word or description
-        for keyword in info["keywords"]:
-            if keyword in word_lower or keyword in desc_lower:
-                return category
+    # Exact keyword, then keyword inside the word, then inside the description.
+    # Ties go to the category declared first in CATEGORIES.
+    rank = _exact_keywords.get(word_lower)
+    if rank is None:
+        rank = _keyword_matcher.search(word_lower)
+    if rank is None and desc_lower:
+        rank = _keyword_matcher.search(desc_lower)
+    if rank is not None:
+        return _category_keys[rank]
 
     # Default to koncept if no match
     return "koncept"
 
 
-def get_claude_config_path():
-    """Get Claude Desktop config path based on OS."""
-    import platform
-    system = platform.system()
+def auto_categorize(word: str, description: str = "") -> str:
+    """Automatically categorize a word based on keywords."""
+    return _categorize(word.lower(), (description or "").lower())
 
-    if system == "Darwin":  # macOS
-        return Path.home() / "Library" / "Application Support" / "Claude" / "claude_desktop_config.json"
-    elif system == "Windows":
-        appdata = os.getenv("APPDATA")
-        if appdata:
-            return Path(appdata) / "Claude" / "claude_desktop_config.json"
-    return None
 
+build_category_matcher()
 
-def get_installed_mcp_servers():
-    """Get list of installed MCP servers from Claude Desktop config."""
-    config_path = get_claude_config_path()
-
-    if not config_path or not config_path.exists():
-        return []
 
+def clamp_size(size, default: int = 5) -> int:
+    """Clamp a word size to the 1-10 scale."""
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-
-        servers = config.get("mcpServers", {})
-        return list(servers.keys())
-    except Exception as e:
-        print(f"Error reading Claude config: {e}")
-        return []
-
-
-def load_words():
-    """Load words from JSON file."""
-    global word_cloud_data
-    if WORDS_FILE.exists():
-        with open(WORDS_FILE, 'r') as f:
-            word_cloud_data = json.load(f)
-        # Ensure connections list exists (migration)
-        if "connections" not in word_cloud_data:
-            word_cloud_data["connections"] = []
-    else:
-        word_cloud_data = {"words": [], "connections": [], "last_update": None}
+        return max(1, min(10, int(size)))
+    except (TypeError, ValueError):
+        return default
 
 
-def save_words():
-    """Save words to JSON file."""
-    word_cloud_data["last_update"] = datetime.now().isoformat()
-    with open(WORDS_FILE, 'w') as f:
-        json.dump(word_cloud_data, f, indent=2)
+def get_installed_mcp_servers() -> list[str]:
+    """Get list of installed MCP servers from Claude Desktop config."""
+    return config_reader.read() or []
+
+
+def sync_mcp_servers(added: list[str], removed: list[str]):
+    """
+    Follow changes to the Claude Desktop config in the default cloud: new servers are
+    added to the mcp category and removed servers are taken out of it.
+    """
+    changed = False
+    with clouds.using(DEFAULT_CLOUD) as cloud, cloud.lock:
+        words = cloud.build_word_index()
+        for server_name in added:
+            # Leave servers already in the cloud as the user sized them
+            if server_name.lower() not in words:
+                cloud.upsert_word(server_name, "MCP Server", MCP_SYNC_SIZE, category="mcp", index=words)
+                changed = True
+        for server_name in removed:
+            entry = words.get(server_name.lower())
+            if entry is not None and entry.get("category") == "mcp":
+                cloud.delete_word(server_name)
+                changed = True
+        if changed:
+            cloud.save()
+    if changed:
+        cloud.notify_clients()
+        print(f"Synced MCP servers: +{len(added)} -{len(removed)}", file=sys.stderr)
+
+
+class CachedResponse:
+    """A serialized response body with its compressed variants, each built on first use."""
+
+    def __init__(self, body: bytes, content_type: str, version=None):
+        self.content_type = content_type
+        self.version = version
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.bodies = {"identity": body}
+        self.encodings = ["identity"]
+        if len(body) >= MIN_COMPRESS_SIZE:
+            self.encodings.append("gzip")
+            if brotli is not None:
+                self.encodings.append("br")
+        self._lock = threading.Lock()
+
+    @property
+    def identity(self) -> bytes:
+        """The uncompressed body."""
+        return self.bodies["identity"]
+
+    def body(self, encoding: str) -> bytes:
+        """The body in an encoding from negotiate(), compressing it on first request."""
+        with self._lock:
+            if encoding not in self.bodies:
+                if encoding == "gzip":
+                    self.bodies["gzip"] = gzip.compress(self.identity, compresslevel=6)
+                else:
+                    self.bodies["br"] = brotli.compress(self.identity)
+            return self.bodies[encoding]
+
+    def negotiate(self, accept_encoding: str | None) -> str:
+        """Pick the smallest variant the client accepts."""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            coding, _, params = part.partition(";")
+            key, _, value = params.partition("=")
+            if key.strip() == "q":
+                try:
+                    if float(value) <= 0:
+                        continue
+                except ValueError:
+                    continue
+            accepted.add(coding.strip().lower())
+
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Check an If-None-Match header against this response's ETag."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+
+_html_response = None
+
+
+def get_html_response() -> CachedResponse | None:
+    """Get index.html from memory, re-reading it only when the file changes on disk."""
+    global _html_response
+    try:
+        mtime = HTML_FILE.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    cached = _html_response
+    if cached is None or cached.version != mtime:
+        cached = CachedResponse(HTML_FILE.read_bytes(), 'text/html; charset=utf-8', mtime)
+        _html_response = cached
+    return cached
+
+
+def cloud_url(name: str) -> str:
+    """Web page showing a named cloud."""
+    if name == DEFAULT_CLOUD:
+        return f"http://localhost:{SERVER_PORT}/"
+    return f"http://localhost:{SERVER_PORT}/c/{name}/"
+
+
+class WordCloud:
+    """A named word cloud: its data, indexes, response cache and SSE subscribers."""
+
+    def __init__(self, name: str, path: Path):
+        self.name = name
+        self.path = path
+        self.data = {"words": [], "connections": [], "last_update": None}
+        # Guards data against concurrent access from the HTTP threads
+        self.lock = threading.RLock()
+        # Incremented on every change to data; keys the response cache
+        self.version = 0
+        # Server-side layout: word -> [x, y], published with the state when enabled
+        self.layout_positions = None
+        self.layout_worker = None
+        # Adjacency-list index over connections, updated alongside data
+        self.graph = ConnectionGraph()
+        # Search index over words, built on first search and then kept up to date
+        self._search_index = None
+        # Operation log for rebuilding past states, written on save()
+        self.history = HistoryLog(path)
+        self.sse_clients = []
+        # Pending coalesced SSE update, see notify_clients()
+        self._notify_timer = None
+        self._notify_lock = threading.Lock()
+        # Serialized size, used for the store's memory budget
+        self.size_bytes = 0
+        # Tool calls and HTTP requests holding the cloud; guarded by the store's lock.
+        # Clouds in use are not evicted, so no change is made to an instance that a
+        # later get() would replace with a fresh copy from disk.
+        self.users = 0
+        self._response = None
+
+    @property
+    def url(self) -> str:
+        """Web page showing this cloud."""
+        return cloud_url(self.name)
+
+    @property
+    def compact_path(self) -> Path:
+        """The cloud's file in the compact format."""
+        return self.path.with_suffix(word_cloud_compact.SUFFIX)
+
+    def load(self):
+        """
+        Load words from the cloud's file.
+
+        A cloud stored only in the format not currently configured is rewritten in the
+        configured one, and the old file is kept with a .bak suffix.
+        """
+        with self.lock:
+            if STORAGE_FORMAT == "compact":
+                preferred, other = self.compact_path, self.path
+            else:
+                preferred, other = self.path, self.compact_path
+            source = preferred if preferred.exists() else other if other.exists() else None
 
+            if source is None:
+                self.data = {"words": [], "connections": [], "last_update": None}
+                self.size_bytes = 0
+            else:
+                if source.suffix == word_cloud_compact.SUFFIX:
+                    self.data = word_cloud_compact.load(source)
+                else:
+                    with open(source, 'r') as f:
+                        self.data = json.load(f)
+                # Ensure connections list exists (migration)
+                if "connections" not in self.data:
+                    self.data["connections"] = []
+                self.size_bytes = source.stat().st_size
+                if source == other:
+                    self.write()
+                    other.replace(other.with_name(other.name + ".bak"))
+            self.graph.rebuild(word_cloud_compact.iter_rows(self.data["words"], ("word",)),
+                               word_cloud_compact.iter_rows(self.data["connections"], ("source", "target")))
+            self._search_index = None
+            self.history.open(self.data)
+            self.version += 1
+        self.schedule_layout()
+
+    def write(self):
+        """Write the data to disk in the configured format. Caller must hold the lock."""
+        if STORAGE_FORMAT == "compact":
+            word_cloud_compact.dump(self.data, self.compact_path)
+            self.size_bytes = self.compact_path.stat().st_size
+        else:
+            text = json.dumps(self.data, indent=2, default=word_cloud_compact.json_default)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'w') as f:
+                f.write(text)
+            self.size_bytes = len(text)
+
+    def save(self):
+        """Save words to the cloud's file."""
+        with self.lock:
+            self.data["last_update"] = datetime.now().isoformat()
+            self.version += 1
+            self.write()
+            self.history.flush(self.data)
+        self.schedule_layout()
+
+    def start_layout(self):
+        """Start laying out this cloud server-side."""
+        if self.layout_worker is None:
+            from word_cloud_layout import LayoutWorker
+            self.layout_worker = LayoutWorker(self.layout_snapshot, self.publish_layout)
+            self.layout_worker.start()
+            self.layout_worker.schedule()
+
+    def stop_layout(self):
+        """Stop the layout thread, e.g. when the cloud is evicted."""
+        if self.layout_worker is not None:
+            self.layout_worker.stop()
+            self.layout_worker = None
+
+    def schedule_layout(self):
+        if self.layout_worker is not None:
+            self.layout_worker.schedule()
+
+    def layout_snapshot(self) -> tuple[list, list]:
+        """Copy the words and connections for the layout thread."""
+        with self.lock:
+            return (list(word_cloud_compact.iter_rows(self.data["words"])),
+                    list(word_cloud_compact.iter_rows(self.data["connections"])))
+
+    def publish_layout(self, positions: dict | None):
+        """Publish new word positions, or None to keep the old ones, to HTTP and SSE clients."""
+        if positions is not None:
+            with self.lock:
+                self.layout_positions = positions
+                self.version += 1
+        self._queue_update()
+
+    def get_words_response(self) -> CachedResponse:
+        """Get the serialized cloud, rebuilding it only when the state has changed."""
+        with self.lock:
+            cached = self._response
+            if cached is not None and cached.version == self.version:
+                return cached
+            version = self.version
+            payload = self.data
+            if self.layout_positions is not None:
+                payload = dict(self.data, positions=self.layout_positions)
+            body = json.dumps(payload, default=word_cloud_compact.json_default).encode()
+
+        # Compress outside the lock so mutations are not held up
+        cached = CachedResponse(body, 'application/json', version)
+        with self.lock:
+            if self._response is None or self._response.version < version:
+                self._response = cached
+        return cached
+
+    def notify_clients(self):
+        """
+        Notify SSE clients that the cloud has changed.
+
+        Changes arriving within SSE_COALESCE_SECONDS of each other are sent as one update,
+        serialized once for all clients when the window closes. While a layout run is
+        pending the update is left to it, so clients get the change and its positions in
+        one push.
+        """
+        worker = self.layout_worker
+        if worker is not None and worker.pending:
+            return
+        self._queue_update()
+
+    def _queue_update(self):
+        """Start the SSE_COALESCE_SECONDS timer unless one is pending; takes _notify_lock, so call without it."""
+        with self._notify_lock:
+            if self._notify_timer is not None or not self.sse_clients:
+                return  # An update is already pending and will include this change
+            if SSE_COALESCE_SECONDS > 0:
+                self._notify_timer = threading.Timer(SSE_COALESCE_SECONDS, self._send_to_clients)
+                self._notify_timer.daemon = True
+                self._notify_timer.start()
+                return
+        self._send_to_clients()
+
+    def _send_to_clients(self):
+        """Send the current state to all clients; run by the timer when the window closes, without _notify_lock held."""
+        with self._notify_lock:
+            self._notify_timer = None
+            clients = list(self.sse_clients)
+        if clients:
+            body = self.get_words_response().identity
+            for client in clients:
+                client.enqueue(body)
+
+    def add_client(self, client: "SSEClient"):
+        """Register an SSE client for this cloud's updates."""
+        with self._notify_lock:
+            self.sse_clients.append(client)
+
+    def remove_client(self, client: "SSEClient"):
+        """Unregister an SSE client, e.g. when its connection closes."""
+        with self._notify_lock:
+            if client in self.sse_clients:
+                self.sse_clients.remove(client)
+
+    @property
+    def search_index(self) -> WordIndex:
+        """Prefix and fuzzy search index over the words. Caller must hold the lock."""
+        if self._search_index is None:
+            self._search_index = WordIndex()
+            self._search_index.rebuild(self.build_word_index())
+        return self._search_index
+
+    def build_word_index(self) -> MutableMapping:
+        """Map lowercased words to their entries in data."""
+        return word_cloud_compact.by_key(self.data["words"], lambda w: w["word"].lower(), ("word",))
+
+    def build_connection_index(self) -> MutableMapping:
+        """Map lowercased (source, target) pairs to their connection entries."""
+        return word_cloud_compact.by_key(self.data["connections"],
+                                         lambda c: (c["source"].lower(), c["target"].lower()),
+                                         ("source", "target"))
+
+    def upsert_word(self, word: str, description: str = "", size=5, category: str | None = None,
+                    index: MutableMapping | None = None) -> tuple[str, dict]:
+        """
+        Add a word or update it if it already exists. Caller must hold the lock.
+
+        Args:
+            word: The word to add
+            description: Description or category name
+            size: Relative size (clamped to 1-10)
+            category: Category key; auto-categorized from word and description if omitted
+            index: Word index from build_word_index(), kept up to date when given
+
+        Returns:
+            Tuple of ("Added" or "Updated", the word entry)
+        """
+        if index is None:
+            index = self.build_word_index()
+        if category is None:
+            category = auto_categorize(word, description)
+
+        existing = index.get(word.lower())
+        self.history.before_change()
+        if existing:
+            existing["description"] = description
+            existing["category"] = category
+            existing["size"] = clamp_size(size)
+            existing["updated"] = datetime.now().isoformat()
+            self.history.record("w", existing["word"], description, category, existing["size"])
+            return "Updated", existing
+
+        entry = {
+            "word": word,
+            "description": description,
+            "category": category,
+            "size": clamp_size(size),
+            "added": datetime.now().isoformat()
+        }
+        self.data["words"].append(entry)
+        index[word.lower()] = entry
+        self.graph.add_node(word)
+        if self._search_index is not None:
+            self._search_index.add(entry)
+        self.history.record("w", word, description, category, entry["size"])
+        return "Added", entry
+
+    def upsert_connection(self, source: str, target: str, label: str = "",
+                          index: MutableMapping | None = None) -> tuple[str, dict]:
+        """
+        Add a connection or update its label if it already exists. Caller must hold the lock
+        and have verified that both words exist.
+
+        Returns:
+            Tuple of ("Added" or "Updated", the connection entry)
+        """
+        if index is None:
+            index = self.build_connection_index()
+
+        key = (source.lower(), target.lower())
+        existing = index.get(key)
+        self.history.before_change()
+        if existing:
+            existing["label"] = label
+            self.history.record("c", existing["source"], existing["target"], label)
+            return "Updated", existing
+
+        entry = {
+            "source": source,
+            "target": target,
+            "label": label,
+            "added": datetime.now().isoformat()
+        }
+        self.data["connections"].append(entry)
+        index[key] = entry
+        self.graph.add_edge(source, target)
+        self.history.record("c", source, target, label)
+        return "Added", entry
+
+    def delete_connection(self, source: str, target: str) -> bool:
+        """Remove a connection. Caller must hold the lock. Returns True if one was removed."""
+        remaining = word_cloud_compact.select(
+            self.data["connections"],
+            lambda c: not (c["source"].lower() == source.lower() and c["target"].lower() == target.lower()),
+            ("source", "target")
+        )
+        if len(remaining) == len(self.data["connections"]):
+            return False
+        self.history.before_change()
+        self.data["connections"] = remaining
+        self.graph.remove_edge(source, target)
+        self.history.record("c-", source, target)
+        return True
+
+    def delete_word(self, word: str) -> int | None:
+        """
+        Remove a word and its connections. Caller must hold the lock.
+
+        Returns:
+            Number of connections removed with the word, or None if the word was not found
+        """
+        remaining = word_cloud_compact.select(
+            self.data["words"], lambda w: w["word"].lower() != word.lower(), ("word",)
+        )
+        if len(remaining) == len(self.data["words"]):
+            return None
+        self.history.before_change()
+        self.data["words"] = remaining
+
+        # Also remove associated connections
+        original_conn_count = len(self.data["connections"])
+        self.data["connections"] = word_cloud_compact.select(
+            self.data["connections"],
+            lambda c: c["source"].lower() != word.lower() and c["target"].lower() != word.lower(),
+            ("source", "target")
+        )
+        self.graph.remove_node(word)
+        if self._search_index is not None:
+            self._search_index.remove(word)
+        self.history.record("w-", word)
+        return original_conn_count - len(self.data["connections"])
+
+    def clear(self):
+        """Remove all words and connections. Caller must hold the lock."""
+        self.history.before_change()
+        self.data["words"] = []
+        self.data["connections"] = []
+        self.graph.rebuild([], [])
+        self._search_index = None
+        self.history.record("x")
+
+
+class CloudStore:
+    """
+    Registry of named clouds.
+
+    Clouds are loaded on first access and kept in least-recently-used order. When the
+    loaded clouds' combined size exceeds the memory budget, the least recently used ones
+    that are not in use (see get(hold=True)) and have no SSE subscribers are dropped from
+    memory (their data is already on disk).
+    """
+
+    def __init__(self, memory_budget: int = MEMORY_BUDGET_BYTES):
+        self.memory_budget = memory_budget
+        self.clouds: OrderedDict[str, WordCloud] = OrderedDict()
+        self.lock = threading.Lock()
+        self.layout_enabled = False
+        # Clouds being loaded; set when the load finishes. Callers wait on these instead
+        # of holding the store lock, so one large load does not block other clouds
+        self.loading: dict[str, threading.Event] = {}
+
+    @staticmethod
+    def path_for(name: str) -> Path:
+        """JSON file for a cloud (the compact file uses the same name). The default cloud keeps using words.json."""
+        return WORDS_FILE if name == DEFAULT_CLOUD else CLOUDS_DIR / f"{name}.json"
+
+    def get(self, name: str | None = None, hold: bool = False) -> WordCloud:
+        """
+        Get a cloud by name, loading it if needed. Raises ValueError for invalid names.
+
+        With hold, the cloud is marked in use and is not evicted until release(cloud).
+        Callers that change the cloud must hold it.
+        """
+        name = name or DEFAULT_CLOUD
+        if not CLOUD_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid cloud name '{name}'. Use letters, digits, '-' and '_' (max 64)")
+
+        while True:
+            with self.lock:
+                cloud = self.clouds.get(name)
+                if cloud is not None:
+                    self.clouds.move_to_end(name)
+                    cloud.users += hold
+                    return cloud
+                ready = self.loading.get(name)
+                if ready is None:
+                    ready = self.loading[name] = threading.Event()
+                    break
+            # Another thread is loading this cloud; wait for it, then look again
+            ready.wait()
 
-def notify_clients():
-    """Notify all SSE clients about data update."""
-    for client in sse_clients[:]:
         try:
-            client.notify()
-        except:
-            sse_clients.remove(client)
-
-
-class WordCloudHTTPHandler(BaseHTTPRequestHandler):
-    """HTTP handler for word cloud web interface."""
+            cloud = WordCloud(name, self.path_for(name))
+            cloud.load()
+            with self.lock:
+                self.clouds[name] = cloud
+                cloud.users += hold
+                if self.layout_enabled:
+                    cloud.start_layout()
+                self._evict(keep=name)
+            return cloud
+        finally:
+            with self.lock:
+                del self.loading[name]
+            ready.set()
+
+    def enable_layout(self):
+        """Start server-side layout for loaded clouds and clouds loaded from now on, if NumPy is available."""
+        from word_cloud_layout import layout_available
+        if not layout_available():
+            return
+        with self.lock:
+            self.layout_enabled = True
+            loaded = list(self.clouds.values())
+        for cloud in loaded:
+            cloud.start_layout()
+
+    def release(self, cloud: WordCloud):
+        """Mark a cloud from get(hold=True) as no longer in use."""
+        with self.lock:
+            cloud.users -= 1
+            self._evict()
+
+    @contextmanager
+    def using(self, name: str | None = None) -> Iterator[WordCloud]:
+        """Hold a cloud for the duration of a with block."""
+        cloud = self.get(name, hold=True)
+        try:
+            yield cloud
+        finally:
+            self.release(cloud)
+
+    def _evict(self, keep: str | None = None):
+        """Drop least recently used clouds until within the memory budget. Caller must hold the lock."""
+        total = sum(c.size_bytes for c in self.clouds.values())
+        for name in list(self.clouds):
+            if total <= self.memory_budget:
+                break
+            cloud = self.clouds[name]
+            if name == keep or cloud.users or cloud.sse_clients:
+                continue
+            cloud.stop_layout()
+            del self.clouds[name]
+            total -= cloud.size_bytes
+
+    def names(self) -> list[str]:
+        """Names of all clouds, on disk or in memory."""
+        names = {DEFAULT_CLOUD}
+        if CLOUDS_DIR.exists():
+            for pattern in ("*.json", f"*{word_cloud_compact.SUFFIX}"):
+                names.update(p.stem for p in CLOUDS_DIR.glob(pattern) if CLOUD_NAME_PATTERN.match(p.stem))
+        with self.lock:
+            names.update(self.clouds)
+        return sorted(names)
+
+    def loaded(self) -> dict[str, WordCloud]:
+        """Clouds currently in memory, least recently used first."""
+        with self.lock:
+            return dict(self.clouds)
+
+
+clouds = CloudStore()
+config_reader = ConfigReader()
+
+
+class WordCloudHTTPHandler:
+    """
+    HTTP handler for word cloud web interface.
+
+    Combined with BaseHTTPRequestHandler by http_handler_class(), so http.server is only
+    imported when the web server starts.
+    """
 
     def log_message(self, format, *args):
         """Suppress default logging."""
         pass
 
+    def resolve_cloud(self) -> tuple[WordCloud | None, str]:
+        """
+        Find the cloud a request is for and the path within it.
+
+        Clouds are selected by a /c/<name>/ path prefix or a ?cloud=<name> query parameter;
+        without either the default cloud is used.
+        """
+        parsed_path = urlparse(self.path)
+        path = parsed_path.path
+        name = parse_qs(parsed_path.query).get("cloud", [None])[0]
+
+        if path.startswith("/c/"):
+            name, slash, rest = path[3:].partition("/")
+            if not slash:
+                # Relative API URLs in index.html need the trailing slash
+                self.send_response(301)
+                self.send_header('Location', f"/c/{name}/")
+                self.end_headers()
+                return None, ""
+            path = "/" + rest
+
+        try:
+            # Held until the request is done, see do_GET()
+            return clouds.get(name, hold=True), path
+        except ValueError as e:
+            self.send_error(404, str(e))
+            return None, ""
+
     def do_GET(self):
         """Handle GET requests."""
-        parsed_path = urlparse(self.path)
+        cloud, path = self.resolve_cloud()
+        if cloud is None:
+            return
 
-        if parsed_path.path == '/':
-            self.serve_html()
-        elif parsed_path.path == '/api/words':
-            self.serve_words_json()
-        elif parsed_path.path == '/api/events':
-            self.serve_sse()
-        else:
-            self.send_error(404)
+        try:
+            if path == '/':
+                self.serve_html()
+            elif path == '/api/words':
+                self.serve_words_json(cloud)
+            elif path == '/api/events':
+                self.serve_sse(cloud)
+            elif path == '/api/replay':
+                self.serve_replay(cloud)
+            else:
+                self.send_error(404)
+        finally:
+            clouds.release(cloud)
 
     def do_POST(self):
         """Handle POST requests."""
-        parsed_path = urlparse(self.path)
+        cloud, path = self.resolve_cloud()
+        if cloud is None:
+            return
 
-        if parsed_path.path == '/api/connect':
-            self.handle_connect()
-        elif parsed_path.path == '/api/disconnect':
-            self.handle_disconnect()
-        else:
-            self.send_error(404)
+        try:
+            if path == '/api/connect':
+                self.handle_connect(cloud)
+            elif path == '/api/disconnect':
+                self.handle_disconnect(cloud)
+            else:
+                self.send_error(404)
+        finally:
+            clouds.release(cloud)
 
-    def handle_connect(self):
+    def handle_connect(self, cloud: WordCloud):
         """Handle connection creation via API."""
         try:
             content_length = int(self.headers['Content-Length'])
@@ -216,29 +914,27 @@ class WordCloudHTTPHandler(BaseHTTPRequestHandler):
                 self.send_error(400, "Missing source or target")
                 return
 
-            # Verify words exist (case-insensitive)
-            words = {w["word"].lower(): w["word"] for w in word_cloud_data["words"]}
-            if source.lower() not in words or target.lower() not in words:
-                self.send_error(400, "One or both words not found")
-                return
-            
-            # Use original casing
-            real_source = words[source.lower()]
-            real_target = words[target.lower()]
-
-            # Check existing
-            exists = any(c["source"].lower() == source.lower() and c["target"].lower() == target.lower() 
-                        for c in word_cloud_data["connections"])
-            
+            with cloud.lock:
+                # Verify words exist (case-insensitive)
+                words = {w["word"].lower(): w["word"]
+                         for w in word_cloud_compact.iter_rows(cloud.data["words"], ("word",))}
+                if source.lower() not in words or target.lower() not in words:
+                    self.send_error(400, "One or both words not found")
+                    return
+
+                # Use original casing
+                real_source = words[source.lower()]
+                real_target = words[target.lower()]
+
+                # Check existing
+                exists = any(c["source"].lower() == source.lower() and c["target"].lower() == target.lower()
+                            for c in word_cloud_compact.iter_rows(cloud.data["connections"], ("source", "target")))
+
+                if not exists:
+                    cloud.upsert_connection(real_source, real_target)
+                    cloud.save()
             if not exists:
-                word_cloud_data["connections"].append({
-                    "source": real_source,
-                    "target": real_target,
-                    "label": "",
-                    "added": datetime.now().isoformat()
-                })
-                save_words()
-                notify_clients()
+                cloud.notify_clients()
 
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -249,7 +945,7 @@ class WordCloudHTTPHandler(BaseHTTPRequestHandler):
             print(f"Error handling connect: {e}")
             self.send_error(500, str(e))
 
-    def handle_disconnect(self):
+    def handle_disconnect(self, cloud: WordCloud):
         """Handle connection removal via API."""
         try:
             content_length = int(self.headers['Content-Length'])
@@ -263,15 +959,13 @@ class WordCloudHTTPHandler(BaseHTTPRequestHandler):
                 self.send_error(400, "Missing source or target")
                 return
 
-            original_count = len(word_cloud_data["connections"])
-            word_cloud_data["connections"] = [
-                c for c in word_cloud_data["connections"]
-                if not (c["source"].lower() == source.lower() and c["target"].lower() == target.lower())
-            ]
+            with cloud.lock:
+                removed = cloud.delete_connection(source, target)
+                if removed:
+                    cloud.save()
 
-            if len(word_cloud_data["connections"]) < original_count:
-                save_words()
-                notify_clients()
+            if removed:
+                cloud.notify_clients()
 
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -282,83 +976,180 @@ class WordCloudHTTPHandler(BaseHTTPRequestHandler):
             print(f"Error handling disconnect: {e}")
             self.send_error(500, str(e))
 
+    def send_cached(self, cached: CachedResponse, extra_headers: dict | None = None):
+        """Send a cached response, answering 304 when the client's copy is current."""
+        headers = {
+            'ETag': cached.etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        headers.update(extra_headers or {})
+
+        if cached.matches(self.headers.get('If-None-Match')):
+            self.send_response(304)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            return
+
+        encoding = cached.negotiate(self.headers.get('Accept-Encoding'))
+        body = cached.body(encoding)
+        self.send_response(200)
+        self.send_header('Content-type', cached.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != "identity":
+            self.send_header('Content-Encoding', encoding)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
     def serve_html(self):
         """Serve the main HTML page."""
-        html_file = Path(__file__).parent / "index.html"
-        if html_file.exists():
-            with open(html_file, 'r') as f:
-                content = f.read()
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(content.encode())
-        else:
+        cached = get_html_response()
+        if cached is None:
             self.send_error(404, "index.html not found")
+            return
+        self.send_cached(cached)
 
-    def serve_words_json(self):
-        """Serve current words as JSON."""
+    def serve_words_json(self, cloud: WordCloud):
+        """Serve current words as JSON, or the cloud as it was at ?at=<timestamp>."""
+        at = parse_qs(urlparse(self.path).query).get("at", [None])[0]
+        if at is None:
+            self.send_cached(cloud.get_words_response(), {'Access-Control-Allow-Origin': '*'})
+            return
+
+        try:
+            at = parse_timestamp(at)
+        except ValueError:
+            self.send_error(400, "Invalid timestamp; use epoch seconds or ISO 8601")
+            return
+        with cloud.lock:
+            state = cloud.history.state_at(at)
+        body = json.dumps(state).encode()
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps(word_cloud_data).encode())
+        self.wfile.write(body)
+
+    def serve_replay(self, cloud: WordCloud):
+        """
+        Stream how the cloud grew as Server-Sent Events.
+
+        Query parameters: from/to (timestamps) limit the period, frames (default 200) the
+        number of states sent and duration (default 20) the playback time in seconds.
+        The stream ends with an "end" event.
+        """
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            start = parse_timestamp(query["from"][0]) if "from" in query else None
+            end = parse_timestamp(query["to"][0]) if "to" in query else None
+            frames = max(1, min(int(query.get("frames", ["200"])[0]), 2000))
+            duration = max(0.0, min(float(query.get("duration", ["20"])[0]), 600.0))
+        except ValueError:
+            self.send_error(400, "Invalid replay parameters")
+            return
 
-    def serve_sse(self):
-        """Serve Server-Sent Events stream."""
         self.send_response(200)
         self.send_header('Content-type', 'text/event-stream')
         self.send_header('Cache-Control', 'no-cache')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
 
-        # Create client notifier
-        client = SSEClient(self.wfile)
-        sse_clients.append(client)
+        # The log is append-only, so replaying up to its current size needs no lock
+        with cloud.lock:
+            limit = cloud.history.log_size()
+        delay = duration / frames
+        try:
+            for _, state in cloud.history.replay(start, end, frames, limit):
+                self.wfile.write(b"data: " + json.dumps(state).encode() + b"\n\n")
+                self.wfile.flush()
+                time.sleep(delay)
+            self.wfile.write(b"event: end\ndata: {}\n\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def serve_sse(self, cloud: WordCloud):
+        """Serve Server-Sent Events stream."""
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
 
-        # Send initial data
-        client.send_data(word_cloud_data)
+        # Subscribe before taking the initial state so no change in between is missed
+        client = SSEClient(self.wfile, SSE_QUEUE_SIZE)
+        cloud.add_client(client)
+        client.enqueue(cloud.get_words_response().identity)
 
-        # Keep connection alive
         try:
             while True:
-                client.wait_for_notification()
-                if client.should_send:
-                    client.send_data(word_cloud_data)
-                    client.should_send = False
-        except:
-            if client in sse_clients:
-                sse_clients.remove(client)
+                body = client.next_update(timeout=30)
+                if body is None:
+                    client.send_keepalive()  # Also detects clients that went away
+                else:
+                    client.send_data(body)
+        except OSError:
+            pass  # Client disconnected (broken pipe, connection reset)
+        finally:
+            cloud.remove_client(client)
 
 
 class SSEClient:
-    """Represents an SSE client connection."""
+    """An SSE connection with a small outbound queue of serialized states."""
 
-    def __init__(self, wfile):
+    def __init__(self, wfile, queue_size: int = SSE_QUEUE_SIZE):
         self.wfile = wfile
-        self.should_send = False
+        # Full states, so when the queue is full the oldest can be dropped (latest wins)
+        self.queue = deque(maxlen=queue_size)
         self.event = threading.Event()
+        self.dropped = 0
 
-    def notify(self):
-        """Notify this client of an update."""
-        self.should_send = True
+    def enqueue(self, body: bytes):
+        """Queue a state for sending, dropping the oldest queued one if full."""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(body)
         self.event.set()
 
-    def wait_for_notification(self):
-        """Wait for notification with timeout."""
-        self.event.wait(timeout=30)  # 30 second timeout
-        self.event.clear()
+    def next_update(self, timeout: float) -> bytes | None:
+        """Wait for the next queued state, or None on timeout."""
+        while True:
+            try:
+                return self.queue.popleft()
+            except IndexError:
+                pass
+            if not self.event.wait(timeout):
+                return None
+            self.event.clear()
+
+    def send_data(self, body: bytes):
+        """Send a serialized JSON body to the client."""
+        self.wfile.write(b"data: " + body + b"\n\n")
+        self.wfile.flush()
 
-    def send_data(self, data):
-        """Send data to client."""
-        message = f"data: {json.dumps(data)}\n\n"
-        self.wfile.write(message.encode())
+    def send_keepalive(self):
+        """Send an SSE comment, which browsers ignore."""
+        self.wfile.write(b": keep-alive\n\n")
         self.wfile.flush()
 
+
+@lru_cache(maxsize=None)
+def http_handler_class() -> type:
+    """The request handler class for http.server."""
+    from http.server import BaseHTTPRequestHandler
+    return type("WordCloudHTTPHandler", (WordCloudHTTPHandler, BaseHTTPRequestHandler), {})
+
+
 def run_http_server():
     """Run the HTTP server in a separate thread."""
-    load_words()
-    httpd = HTTPServer(('localhost', SERVER_PORT), WordCloudHTTPHandler)
-    print(f"Word Cloud web server running at http://localhost:{SERVER_PORT}/")
+    from http.server import ThreadingHTTPServer
+    # Threaded so an open SSE stream does not block other requests
+    httpd = ThreadingHTTPServer(('localhost', SERVER_PORT), http_handler_class())
+    print(f"Word Cloud web server running at http://localhost:{SERVER_PORT}/", file=sys.stderr)
     httpd.serve_forever()
 
 
@@ -366,10 +1157,16 @@ def run_http_server():
 server = Server("word-cloud-manager")
 
 
+CLOUD_PROPERTY = {
+    "type": "string",
+    "description": f"Name of the cloud to use (default: '{DEFAULT_CLOUD}'). New names create a new cloud"
+}
+
+
 @server.list_tools()
 async def handle_list_tools() -> list[types.Tool]:
     """List available tools."""
-    return [
+    tools = [
         MCPToolBuilder.create_tool(
             name="add_word",
             description="Add a word to the word cloud with optional category/description",
@@ -386,10 +1183,90 @@ async def handle_list_tools() -> list[types.Tool]:
                     "type": "number",
                     "description": "Relative size/importance (1-10, default: 5)",
                     "default": 5
+                },
+                "check_duplicates": {
+                    "type": "boolean",
+                    "description": "If the word is new and similar words already exist (e.g. 'Postgres' for 'PostgreSQL'), list them instead of adding it (default: false)",
+                    "default": False
                 }
             },
             required=["word"]
         ),
+        MCPToolBuilder.create_tool(
+            name="add_words",
+            description="Add or update many words in one call. Saves and refreshes the browser once for the whole batch",
+            properties={
+                "words": {
+                    "type": "array",
+                    "description": "Words to add, each with 'word' and optional 'description' and 'size' (1-10)",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "word": {"type": "string"},
+                            "description": {"type": "string"},
+                            "size": {"type": "number"}
+                        },
+                        "required": ["word"]
+                    }
+                }
+            },
+            required=["words"]
+        ),
+        MCPToolBuilder.create_tool(
+            name="ingest_text",
+            description="Build the cloud from a text or a text file: counts word frequencies (Swedish/English stop words removed) and adds the most frequent words sized 1-10 by frequency",
+            properties={
+                "text": {
+                    "type": "string",
+                    "description": "Text to ingest (use 'path' for large files)"
+                },
+                "path": {
+                    "type": "string",
+                    "description": "Path to a UTF-8 text file, streamed without loading it into memory"
+                },
+                "language": {
+                    "type": "string",
+                    "enum": ["sv", "en", "auto"],
+                    "description": "Stop-word language (default: auto = both)",
+                    "default": "auto"
+                },
+                "max_words": {
+                    "type": "integer",
+                    "description": "Number of most frequent words to add (default: 50)",
+                    "default": 50
+                },
+                "min_count": {
+                    "type": "integer",
+                    "description": "Ignore words seen fewer times than this (default: 2)",
+                    "default": 2
+                },
+                "min_length": {
+                    "type": "integer",
+                    "description": "Ignore words shorter than this (default: 3)",
+                    "default": 3
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Description for new words (default: the file name or 'text')"
+                },
+                "connect": {
+                    "type": "boolean",
+                    "description": "Also create connections between words in the cloud that often appear near each other in the text (default: false)",
+                    "default": False
+                },
+                "window": {
+                    "type": "integer",
+                    "description": "With connect: words within this many positions co-occur (default: 5)",
+                    "default": 5
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": "With connect: maximum new connections per word, strongest first (default: 3)",
+                    "default": 3
+                }
+            },
+            required=[]
+        ),
         MCPToolBuilder.create_tool(
             name="remove_word",
             description="Remove a word from the word cloud",
@@ -420,6 +1297,26 @@ async def handle_list_tools() -> list[types.Tool]:
             },
             required=["source", "target"]
         ),
+        MCPToolBuilder.create_tool(
+            name="add_connections",
+            description="Create or update many connections in one call. Saves and refreshes the browser once for the whole batch",
+            properties={
+                "connections": {
+                    "type": "array",
+                    "description": "Connections to add, each with 'source', 'target' and optional 'label'",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "source": {"type": "string"},
+                            "target": {"type": "string"},
+                            "label": {"type": "string"}
+                        },
+                        "required": ["source", "target"]
+                    }
+                }
+            },
+            required=["connections"]
+        ),
         MCPToolBuilder.create_tool(
             name="remove_connection",
             description="Remove a connection between two words",
@@ -453,6 +1350,94 @@ async def handle_list_tools() -> list[types.Tool]:
             properties={},
             required=[]
         ),
+        MCPToolBuilder.create_tool(
+            name="search_words",
+            description="Find words in the cloud by prefix or approximate spelling, best matches first",
+            properties={
+                "query": {
+                    "type": "string",
+                    "description": "Word, beginning of a word or misspelling to look for"
+                },
+                "limit": {
+                    "type": "number",
+                    "description": "Maximum number of results (default: 10)",
+                    "default": 10
+                }
+            },
+            required=["query"]
+        ),
+        MCPToolBuilder.create_tool(
+            name="shortest_path",
+            description="Find the shortest chain of connections between two words",
+            properties={
+                "source": {
+                    "type": "string",
+                    "description": "The word to start from"
+                },
+                "target": {
+                    "type": "string",
+                    "description": "The word to reach"
+                },
+                "directed": {
+                    "type": "boolean",
+                    "description": "Only follow arrows in their direction (default: true)",
+                    "default": True
+                }
+            },
+            required=["source", "target"]
+        ),
+        MCPToolBuilder.create_tool(
+            name="connected_components",
+            description="List groups of words that are linked to each other by connections (ignoring direction)",
+            properties={
+                "min_size": {
+                    "type": "integer",
+                    "description": "Only show groups with at least this many words (default: 2)",
+                    "default": 2
+                }
+            },
+            required=[]
+        ),
+        MCPToolBuilder.create_tool(
+            name="word_importance",
+            description="Rank words by importance in the connection graph using PageRank or degree",
+            properties={
+                "metric": {
+                    "type": "string",
+                    "enum": ["pagerank", "degree"],
+                    "description": "Ranking metric (default: pagerank)",
+                    "default": "pagerank"
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "Number of words to show (default: 10)",
+                    "default": 10
+                }
+            },
+            required=[]
+        ),
+        MCPToolBuilder.create_tool(
+            name="neighbourhood",
+            description="List the words within k connection hops of a word",
+            properties={
+                "word": {
+                    "type": "string",
+                    "description": "The centre word"
+                },
+                "hops": {
+                    "type": "integer",
+                    "description": "Maximum number of hops (default: 1)",
+                    "default": 1
+                },
+                "direction": {
+                    "type": "string",
+                    "enum": ["out", "in", "both"],
+                    "description": "Follow outgoing, incoming or all connections (default: both)",
+                    "default": "both"
+                }
+            },
+            required=["word"]
+        ),
         MCPToolBuilder.create_tool(
             name="open_browser",
             description="Open the word cloud visualization in your default web browser automatically",
@@ -483,15 +1468,41 @@ async def handle_list_tools() -> list[types.Tool]:
             },
             required=[]
         ),
+        MCPToolBuilder.create_tool(
+            name="list_clouds",
+            description="List all named word clouds and which of them are loaded in memory",
+            properties={},
+            required=[]
+        ),
     ]
 
+    # Every tool can target a named cloud
+    for tool in tools:
+        tool.inputSchema["properties"]["cloud"] = CLOUD_PROPERTY
+    return tools
+
 
 @server.call_tool()
 async def handle_call_tool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
     """Handle tool execution requests."""
+    try:
+        # Off the event loop: a cold cloud is loaded here, and one that is still loading
+        # is waited for, without holding up other MCP requests
+        cloud = await asyncio.to_thread(clouds.get, safe_get_arg(arguments, "cloud"), True)
+    except ValueError as e:
+        return create_error_response(str(e))
+    try:
+        return await run_tool(cloud, name, arguments)
+    finally:
+        clouds.release(cloud)
 
+
+async def run_tool(
+    cloud: WordCloud, name: str, arguments: dict | None
+) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+    """Run a tool on a cloud held by handle_call_tool."""
     if name == "add_word":
         word = safe_get_arg(arguments, "word")
         description = safe_get_arg(arguments, "description", "")
@@ -500,65 +1511,176 @@ async def handle_call_tool(
         if not word:
             return create_error_response("word is required")
 
-        # Auto-categorize the word
-        category = auto_categorize(word, description)
-        category_label = CATEGORIES[category]["label"]
-
-        # Check if word already exists
-        existing = next((w for w in word_cloud_data["words"] if w["word"].lower() == word.lower()), None)
-
-        if existing:
-            existing["description"] = description
-            existing["category"] = category
-            existing["size"] = max(1, min(10, int(size)))
-            existing["updated"] = datetime.now().isoformat()
-            action = "Updated"
-        else:
-            word_cloud_data["words"].append({
-                "word": word,
-                "description": description,
-                "category": category,
-                "size": max(1, min(10, int(size))),
-                "added": datetime.now().isoformat()
-            })
-            action = "Added"
-
-        save_words()
-        notify_clients()
+        with cloud.lock:
+            if safe_get_arg(arguments, "check_duplicates", False) and word.lower() not in cloud.graph.names:
+                similar = cloud.search_index.near_duplicates(word)
+                if similar:
+                    return create_text_response(
+                        f"Not added: '{word}' looks like existing word(s): {', '.join(similar)}\n"
+                        f"Update one of those instead, or add '{word}' again without check_duplicates."
+                    )
+            action, entry = cloud.upsert_word(word, description, size)
+            cloud.save()
+        cloud.notify_clients()
+
+        # Auto-categorized label
+        category_label = CATEGORIES[entry["category"]]["label"]
 
         return create_text_response(
             f"{action} word: '{word}' (size: {size})\n"
             f"Category: {category_label}\n"
             f"Description: {description}\n"
-            f"Total words: {len(word_cloud_data['words'])}\n"
-            f"View at: http://localhost:{SERVER_PORT}/"
+            f"Total words: {len(cloud.data['words'])}\n"
+            f"View at: {cloud.url}"
         )
 
+    elif name == "add_words":
+        items = safe_get_arg(arguments, "words", [])
+
+        if not items:
+            return create_error_response("words must be a non-empty list")
+
+        added = updated = 0
+        skipped = []
+        with cloud.lock:
+            index = cloud.build_word_index()
+            for item in items:
+                if isinstance(item, str):
+                    item = {"word": item}
+                word = item.get("word") if isinstance(item, dict) else None
+                if not word:
+                    skipped.append(str(item))
+                    continue
+                action, _ = cloud.upsert_word(word, item.get("description", ""), item.get("size", 5), index=index)
+                if action == "Added":
+                    added += 1
+                else:
+                    updated += 1
+            if added or updated:
+                cloud.save()
+        if added or updated:
+            cloud.notify_clients()
+
+        result = f"Added {added} and updated {updated} word(s)\n"
+        if skipped:
+            result += f"Skipped {len(skipped)} invalid entr{'y' if len(skipped) == 1 else 'ies'}: {', '.join(skipped[:10])}\n"
+        result += f"Total words: {len(cloud.data['words'])}\n"
+        result += f"View at: {cloud.url}"
+        return create_text_response(result)
+
+    elif name == "ingest_text":
+        text = safe_get_arg(arguments, "text")
+        path = safe_get_arg(arguments, "path")
+        language = safe_get_arg(arguments, "language", "auto")
+        max_words = max(1, int(safe_get_arg(arguments, "max_words", 50)))
+        min_count = max(1, int(safe_get_arg(arguments, "min_count", 2)))
+        min_length = max(1, int(safe_get_arg(arguments, "min_length", 3)))
+        connect = safe_get_arg(arguments, "connect", False)
+        window = max(1, int(safe_get_arg(arguments, "window", 5)))
+        top_k = max(1, int(safe_get_arg(arguments, "top_k", 3)))
+
+        if not text and not path:
+            return create_error_response("Either text or path is required")
+        if path and not Path(path).expanduser().is_file():
+            return create_error_response(f"File not found: {path}")
+        description = safe_get_arg(arguments, "description") or (Path(path).name if path else "text")
+        from word_cloud_ingest import cooccurrence_edges, count_words, read_chunks, scale_sizes
+
+        # Count outside the state lock and off the event loop; large files take a while
+        chunks = read_chunks(path) if path else [text]
+        try:
+            sketch = await asyncio.to_thread(
+                count_words, chunks, language, min_length, max(1000, max_words * 20)
+            )
+        except (ValueError, OSError) as e:
+            return create_error_response(str(e))
+
+        top = [(word, count) for word, count in sketch.top(max_words) if count >= min_count]
+        if not top:
+            return create_text_response(
+                f"No words occurring at least {min_count} times found ({sketch.total} tokens read)"
+            )
+        sizes = scale_sizes(top)
+
+        added = updated = 0
+        with cloud.lock:
+            index = cloud.build_word_index()
+            for word, _ in top:
+                existing = index.get(word.lower())
+                # Keep the description of words that are already in the cloud
+                action, _ = cloud.upsert_word(
+                    existing["word"] if existing else word,
+                    existing["description"] if existing else description,
+                    sizes[word],
+                    index=index
+                )
+                if action == "Added":
+                    added += 1
+                else:
+                    updated += 1
+            vocabulary = list(index)
+            cloud.save()
+        # Clients get the words now rather than after the co-occurrence pass
+        cloud.notify_clients()
+
+        # Second pass over the text for co-occurrence between all words now in the cloud
+        connections_added = 0
+        connect_error = None
+        edges = []
+        if connect:
+            chunks = read_chunks(path) if path else [text]
+            try:
+                edges = await asyncio.to_thread(
+                    cooccurrence_edges, chunks, vocabulary, language, min_length, window, top_k, min_count
+                )
+            except (ValueError, OSError) as e:
+                connect_error = str(e)
+        if edges:
+            with cloud.lock:
+                words = cloud.build_word_index()
+                connections = cloud.build_connection_index()
+                for source, target, score, _ in edges:
+                    if source not in words or target not in words:
+                        continue  # Removed while we were counting
+                    # Leave existing connections (in either direction) and their labels alone
+                    if (source, target) in connections or (target, source) in connections:
+                        continue
+                    cloud.upsert_connection(words[source]["word"], words[target]["word"], "co-occurs", index=connections)
+                    connections_added += 1
+                if connections_added:
+                    cloud.save()
+            if connections_added:
+                cloud.notify_clients()
+
+        result = f"Ingested {sketch.total} words, added {added} and updated {updated}\n"
+        if connect_error:
+            result += f"No connections added, the co-occurrence pass failed: {connect_error}\n"
+        elif connect:
+            result += f"Added {connections_added} co-occurrence connection(s)\n"
+        result += "\n"
+        result += "Most frequent:\n"
+        for word, count in top[:15]:
+            result += f"• {word}: {count} (size: {sizes[word]})\n"
+        if sketch.error_bound:
+            result += f"\nCounts may be up to {sketch.error_bound} too low (bounded-memory sketch)\n"
+        result += f"\nTotal words: {len(cloud.data['words'])}\n"
+        result += f"View at: {cloud.url}"
+        return create_text_response(result)
+
     elif name == "remove_word":
         word = safe_get_arg(arguments, "word")
 
         if not word:
             return create_error_response("word is required")
 
-        # Remove word
-        original_count = len(word_cloud_data["words"])
-        word_cloud_data["words"] = [
-            w for w in word_cloud_data["words"]
-            if w["word"].lower() != word.lower()
-        ]
-
-        if len(word_cloud_data["words"]) < original_count:
-            # Also remove associated connections
-            original_conn_count = len(word_cloud_data["connections"])
-            word_cloud_data["connections"] = [
-                c for c in word_cloud_data["connections"]
-                if c["source"].lower() != word.lower() and c["target"].lower() != word.lower()
-            ]
-            conn_removed = original_conn_count - len(word_cloud_data["connections"])
-
-            save_words()
-            notify_clients()
-            msg = f"Removed word: '{word}'\nRemaining words: {len(word_cloud_data['words'])}"
+        with cloud.lock:
+            conn_removed = cloud.delete_word(word)
+            if conn_removed is not None:
+                cloud.save()
+
+        if conn_removed is not None:
+            cloud.notify_clients()
+            msg = f"Removed word: '{word}'\nRemaining words: {len(cloud.data['words'])}"
             if conn_removed > 0:
                 msg += f"\nRemoved {conn_removed} associated connection(s)."
             return create_text_response(msg)
@@ -573,33 +1695,57 @@ async def handle_call_tool(
         if not source or not target:
             return create_error_response("Source and target words are required")
 
-        # Verify both words exist
-        words = [w["word"].lower() for w in word_cloud_data["words"]]
-        if source.lower() not in words:
-            return create_error_response(f"Source word '{source}' not found. Add it first.")
-        if target.lower() not in words:
-            return create_error_response(f"Target word '{target}' not found. Add it first.")
-
-        # Check for existing connection
-        existing = next((c for c in word_cloud_data["connections"] 
-                        if c["source"].lower() == source.lower() and c["target"].lower() == target.lower()), None)
-        
-        if existing:
-            existing["label"] = label
-            action = "Updated"
-        else:
-            word_cloud_data["connections"].append({
-                "source": source,
-                "target": target,
-                "label": label,
-                "added": datetime.now().isoformat()
-            })
-            action = "Added"
-
-        save_words()
-        notify_clients()
+        with cloud.lock:
+            # Verify both words exist
+            words = cloud.build_word_index()
+            if source.lower() not in words:
+                return create_error_response(f"Source word '{source}' not found. Add it first.")
+            if target.lower() not in words:
+                return create_error_response(f"Target word '{target}' not found. Add it first.")
+
+            action, _ = cloud.upsert_connection(source, target, label)
+            cloud.save()
+        cloud.notify_clients()
         return create_text_response(f"{action} connection: {source} -> {target} ({label})")
 
+    elif name == "add_connections":
+        items = safe_get_arg(arguments, "connections", [])
+
+        if not items:
+            return create_error_response("connections must be a non-empty list")
+
+        added = updated = 0
+        skipped = []
+        with cloud.lock:
+            words = cloud.build_word_index()
+            index = cloud.build_connection_index()
+            for item in items:
+                source = item.get("source") if isinstance(item, dict) else None
+                target = item.get("target") if isinstance(item, dict) else None
+                if not source or not target:
+                    skipped.append(f"{item} (source and target required)")
+                    continue
+                if source.lower() not in words or target.lower() not in words:
+                    skipped.append(f"{source} -> {target} (word not found)")
+                    continue
+                action, _ = cloud.upsert_connection(source, target, item.get("label", ""), index=index)
+                if action == "Added":
+                    added += 1
+                else:
+                    updated += 1
+            if added or updated:
+                cloud.save()
+        if added or updated:
+            cloud.notify_clients()
+
+        result = f"Added {added} and updated {updated} connection(s)\n"
+        if skipped:
+            result += f"Skipped {len(skipped)}:\n"
+            for entry in skipped[:10]:
+                result += f"• {entry}\n"
+        result += f"Total connections: {len(cloud.data['connections'])}"
+        return create_text_response(result)
+
     elif name == "remove_connection":
         source = safe_get_arg(arguments, "source")
         target = safe_get_arg(arguments, "target")
@@ -607,15 +1753,13 @@ async def handle_call_tool(
         if not source or not target:
             return create_error_response("Source and target words are required")
 
-        original_count = len(word_cloud_data["connections"])
-        word_cloud_data["connections"] = [
-            c for c in word_cloud_data["connections"]
-            if not (c["source"].lower() == source.lower() and c["target"].lower() == target.lower())
-        ]
+        with cloud.lock:
+            removed = cloud.delete_connection(source, target)
+            if removed:
+                cloud.save()
 
-        if len(word_cloud_data["connections"]) < original_count:
-            save_words()
-            notify_clients()
+        if removed:
+            cloud.notify_clients()
             return create_text_response(f"Removed connection: {source} -> {target}")
         else:
             return create_error_response("Connection not found")
@@ -626,44 +1770,173 @@ async def handle_call_tool(
         if not confirm:
             return create_error_response("confirm must be true to clear all words")
 
-        count = len(word_cloud_data["words"])
-        conn_count = len(word_cloud_data["connections"])
-        word_cloud_data["words"] = []
-        word_cloud_data["connections"] = []
-        save_words()
-        notify_clients()
+        with cloud.lock:
+            count = len(cloud.data["words"])
+            conn_count = len(cloud.data["connections"])
+            cloud.clear()
+            cloud.save()
+        cloud.notify_clients()
 
         return create_text_response(f"Cleared {count} words and {conn_count} connections from the cloud")
 
     elif name == "list_words":
-        if not word_cloud_data["words"]:
+        if not cloud.data["words"]:
             return create_text_response("No words in the cloud yet.")
 
-        result = f"Word Cloud ({len(word_cloud_data['words'])} words):\n\n"
-        for w in sorted(word_cloud_data["words"], key=lambda x: x.get("size", 5), reverse=True):
+        result = f"Word Cloud ({len(cloud.data['words'])} words):\n\n"
+        for w in sorted(word_cloud_compact.iter_rows(cloud.data["words"]), key=lambda x: x.get("size", 5), reverse=True):
             result += f"• {w['word']} (size: {w.get('size', 5)})"
             if w.get('description'):
                 result += f" - {w['description']}"
             result += "\n"
 
-        if word_cloud_data["connections"]:
-            result += f"\nConnections ({len(word_cloud_data['connections'])}):\n"
-            for c in word_cloud_data["connections"]:
+        if cloud.data["connections"]:
+            result += f"\nConnections ({len(cloud.data['connections'])}):\n"
+            for c in word_cloud_compact.iter_rows(cloud.data["connections"]):
                 label = f" [{c['label']}]" if c.get("label") else ""
                 result += f"• {c['source']} -> {c['target']}{label}\n"
 
-        result += f"\nView at: http://localhost:{SERVER_PORT}/"
+        result += f"\nView at: {cloud.url}"
+        return create_text_response(result)
+
+    elif name == "search_words":
+        query = safe_get_arg(arguments, "query", "").strip()
+        limit = max(1, int(safe_get_arg(arguments, "limit", 10)))
+
+        if not query:
+            return create_error_response("query is required")
+
+        with cloud.lock:
+            index = cloud.search_index
+            found = [(dict(index.entries[word.lower()]), kind, distance)
+                     for word, kind, distance in index.search(query, limit)]
+
+        if not found:
+            return create_text_response(f"No words matching '{query}'")
+
+        result = f"Words matching '{query}':\n\n"
+        for entry, kind, distance in found:
+            category_label = CATEGORIES.get(entry.get("category"), {}).get("label", entry.get("category"))
+            match = {"exact": "exact", "prefix": "prefix", "fuzzy": f"{distance} edit(s) away"}[kind]
+            result += f"• {entry['word']} ({category_label}, size: {entry.get('size', 5)}) - {match}\n"
+        return create_text_response(result)
+
+    elif name == "shortest_path":
+        source = safe_get_arg(arguments, "source")
+        target = safe_get_arg(arguments, "target")
+        directed = safe_get_arg(arguments, "directed", True)
+
+        if not source or not target:
+            return create_error_response("Source and target words are required")
+
+        with cloud.lock:
+            for word in (source, target):
+                if word.lower() not in cloud.graph.names:
+                    return create_error_response(f"Word '{word}' not found in cloud")
+            path = cloud.graph.shortest_path(source, target, directed=bool(directed))
+
+        if path is None:
+            kind = "directed path" if directed else "path"
+            return create_text_response(f"No {kind} from '{source}' to '{target}'")
+        return create_text_response(
+            f"Shortest path ({len(path) - 1} hop(s)):\n" + " -> ".join(path)
+        )
+
+    elif name == "connected_components":
+        min_size = max(1, int(safe_get_arg(arguments, "min_size", 2)))
+
+        with cloud.lock:
+            components = cloud.graph.components()
+
+        shown = [c for c in components if len(c) >= min_size]
+        isolated = sum(1 for c in components if len(c) == 1)
+        result = f"{len(components)} component(s), {isolated} unconnected word(s)\n"
+        if shown:
+            result += f"\nComponents with at least {min_size} words:\n"
+            for i, component in enumerate(shown[:20], 1):
+                preview = ", ".join(sorted(component)[:15])
+                more = f", … (+{len(component) - 15})" if len(component) > 15 else ""
+                result += f"{i}. ({len(component)} words) {preview}{more}\n"
+            if len(shown) > 20:
+                result += f"… and {len(shown) - 20} more\n"
+        return create_text_response(result)
+
+    elif name == "word_importance":
+        metric = safe_get_arg(arguments, "metric", "pagerank")
+        top_n = max(1, int(safe_get_arg(arguments, "top_n", 10)))
+
+        if metric not in ("pagerank", "degree"):
+            return create_error_response("metric must be 'pagerank' or 'degree'")
+
+        with cloud.lock:
+            if not cloud.graph.names:
+                return create_text_response("No words in the cloud yet.")
+            degrees = cloud.graph.degrees()
+            scores = cloud.graph.pagerank() if metric == "pagerank" else None
+
+        if metric == "pagerank":
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_n]
+            result = f"Top {len(ranked)} words by PageRank:\n"
+            for i, (word, score) in enumerate(ranked, 1):
+                in_deg, out_deg = degrees[word]
+                result += f"{i}. {word} — {score:.4f} (in: {in_deg}, out: {out_deg})\n"
+        else:
+            ranked = sorted(degrees.items(), key=lambda item: sum(item[1]), reverse=True)[:top_n]
+            result = f"Top {len(ranked)} words by degree:\n"
+            for i, (word, (in_deg, out_deg)) in enumerate(ranked, 1):
+                result += f"{i}. {word} — {in_deg + out_deg} (in: {in_deg}, out: {out_deg})\n"
+        return create_text_response(result)
+
+    elif name == "neighbourhood":
+        word = safe_get_arg(arguments, "word")
+        hops = max(1, int(safe_get_arg(arguments, "hops", 1)))
+        direction = safe_get_arg(arguments, "direction", "both")
+
+        if not word:
+            return create_error_response("word is required")
+        if direction not in ("out", "in", "both"):
+            return create_error_response("direction must be 'out', 'in' or 'both'")
+
+        with cloud.lock:
+            rings = cloud.graph.neighbourhood(word, hops, direction)
+
+        if rings is None:
+            return create_error_response(f"Word '{word}' not found in cloud")
+        if not rings:
+            return create_text_response(f"'{word}' has no connected words ({direction})")
+
+        total = sum(len(r) for r in rings.values())
+        result = f"{total} word(s) within {hops} hop(s) of '{word}' ({direction}):\n"
+        for distance, ring in rings.items():
+            result += f"\n{distance} hop(s): {', '.join(sorted(ring))}\n"
+        return create_text_response(result)
+
+    elif name == "list_clouds":
+        loaded = clouds.loaded()
+        result = "Word clouds:\n\n"
+        for cloud_name in clouds.names():
+            if cloud_name in loaded:
+                c = loaded[cloud_name]
+                status = f"{len(c.data['words'])} words, {len(c.data['connections'])} connections, loaded"
+                if c.sse_clients:
+                    status += f", {len(c.sse_clients)} viewer(s)"
+            else:
+                status = "on disk"
+            result += f"• {cloud_name} ({status})\n  {cloud_url(cloud_name)}\n"
+        used = sum(c.size_bytes for c in loaded.values())
+        result += f"\nMemory: {used / 1024:.0f} KB of {clouds.memory_budget / 1024 / 1024:.0f} MB budget"
         return create_text_response(result)
 
     elif name == "open_browser":
-        url = f"http://localhost:{SERVER_PORT}/"
+        url = cloud.url
         try:
+            import webbrowser  # Rarely used; kept off the startup path
             webbrowser.open(url)
             return create_text_response(
                 f"✓ Opened word cloud in your default browser!\n\n"
                 f"URL: {url}\n\n"
                 f"The word cloud will update automatically when you add new words.\n"
-                f"Current words: {len(word_cloud_data['words'])}"
+                f"Current words: {len(cloud.data['words'])}"
             )
         except Exception as e:
             return create_error_response(
@@ -684,19 +1957,19 @@ async def handle_call_tool(
         return create_text_response(result)
 
     elif name == "list_by_category":
-        if not word_cloud_data["words"]:
+        if not cloud.data["words"]:
             return create_text_response("Inga ord i molnet än.")
 
         # Group words by category
         grouped = {}
-        for word_data in word_cloud_data["words"]:
+        for word_data in word_cloud_compact.iter_rows(cloud.data["words"]):
             category = word_data.get("category", "koncept")
             if category not in grouped:
                 grouped[category] = []
             grouped[category].append(word_data)
 
         # Build result
-        result = f"Ord grupperade efter kategori ({len(word_cloud_data['words'])} totalt):\n\n"
+        result = f"Ord grupperade efter kategori ({len(cloud.data['words'])} totalt):\n\n"
 
         for cat_key in CATEGORIES.keys():
             if cat_key in grouped:
@@ -713,12 +1986,11 @@ async def handle_call_tool(
                     result += f" (size: {word_data.get('size', 5)})\n"
                 result += "\n"
 
-        result += f"View at: http://localhost:{SERVER_PORT}/"
+        result += f"View at: {cloud.url}"
         return create_text_response(result)
 
     elif name == "add_mcp_servers":
-        size = safe_get_arg(arguments, "size", 7)
-        size = max(1, min(10, int(size)))
+        size = clamp_size(safe_get_arg(arguments, "size", 7), default=7)
 
         # Get installed MCP servers
         servers = get_installed_mcp_servers()
@@ -733,28 +2005,16 @@ async def handle_call_tool(
         added = []
         updated = []
 
-        for server_name in servers:
-            # Check if word already exists
-            existing = next((w for w in word_cloud_data["words"] if w["word"].lower() == server_name.lower()), None)
-
-            if existing:
-                existing["category"] = "mcp"
-                existing["description"] = "MCP Server"
-                existing["size"] = size
-                existing["updated"] = datetime.now().isoformat()
-                updated.append(server_name)
-            else:
-                word_cloud_data["words"].append({
-                    "word": server_name,
-                    "description": "MCP Server",
-                    "category": "mcp",
-                    "size": size,
-                    "added": datetime.now().isoformat()
-                })
-                added.append(server_name)
-
-        save_words()
-        notify_clients()
+        with cloud.lock:
+            index = cloud.build_word_index()
+            for server_name in servers:
+                action, _ = cloud.upsert_word(server_name, "MCP Server", size, category="mcp", index=index)
+                if action == "Added":
+                    added.append(server_name)
+                else:
+                    updated.append(server_name)
+            cloud.save()
+        cloud.notify_clients()
 
         result = f"✓ Lade till MCP-servrar i ordmolnet!\n\n"
         if added:
@@ -766,8 +2026,8 @@ async def handle_call_tool(
             for name in updated:
                 result += f"  • {name}\n"
 
-        result += f"\nTotalt ord i molnet: {len(word_cloud_data['words'])}\n"
-        result += f"View at: http://localhost:{SERVER_PORT}/"
+        result += f"\nTotalt ord i molnet: {len(cloud.data['words'])}\n"
+        result += f"View at: {cloud.url}"
 
         return create_text_response(result)
 
@@ -775,11 +2035,23 @@ async def handle_call_tool(
         raise ValueError(f"Unknown tool: {name}")
 
 
+def warm_up():
+    """Load the default cloud, start server-side layout and the config watcher, off the MCP startup path."""
+    started = time.perf_counter()
+    clouds.get(DEFAULT_CLOUD)
+    # Lay out clouds server-side so browsers only render
+    clouds.enable_layout()
+    if MCP_SYNC_SECONDS > 0:
+        ConfigWatcher(config_reader, sync_mcp_servers, MCP_SYNC_SECONDS).start()
+    print(f"Word cloud ready in {(time.perf_counter() - started) * 1000:.0f} ms", file=sys.stderr)
+
+
 async def main():
     """Main entry point for the MCP server."""
-    # Start HTTP server in background thread
-    http_thread = threading.Thread(target=run_http_server, daemon=True)
-    http_thread.start()
+    # The MCP handshake is answered right away; tool calls and web requests that need a
+    # cloud wait in clouds.get(), in a worker thread, until its background load has finished
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    threading.Thread(target=run_http_server, name="http", daemon=True).start()
 
     # Run MCP server
     await run_mcp_server(server, "word-cloud-manager", "0.1.0")